@@ -27,6 +27,8 @@ HTML_AUTO_REFRESH_SECONDS = int(os.getenv("HTML_AUTO_REFRESH_SECONDS", "30"))  #
 ENABLE_AUTO_REFRESH = os.getenv("ENABLE_AUTO_REFRESH", "true").lower() == "true"
 PAUSE_ON_USER_ACTIVITY = os.getenv("PAUSE_ON_USER_ACTIVITY", "true").lower() == "true"
 USER_ACTIVITY_TIMEOUT = int(os.getenv("USER_ACTIVITY_TIMEOUT", "5"))  # Seconds to detect user inactivity
+GZIP_MAP_OUTPUT = os.getenv("GZIP_MAP_OUTPUT", "true").lower() == "true"  # Write .gz copies for the web server
+MAP_MIN_REGENERATE_SECONDS = float(os.getenv("MAP_MIN_REGENERATE_SECONDS", "2"))  # Coalesce map rebuilds closer than this
 
 # Performance Settings
 ENABLE_CONCURRENT_PROCESSING = os.getenv("ENABLE_CONCURRENT_PROCESSING", "true").lower() == "true"
@@ -35,7 +37,7 @@ USE_DATABASE_CACHE = os.getenv("USE_DATABASE_CACHE", "true").lower() == "true"
 DATABASE_PATH = os.getenv("DATABASE_PATH", "data/vessels.db")
 
 # Ship Type Definitions (IMO codes)
-TANKER_TYPES = list(range(70, 90))  # 70-89 are tanker/cargo vessel types
+TANKER_TYPES = frozenset(range(70, 90))  # 70-89 are tanker/cargo vessel types (set for O(1) lookups)
 
 # Regional Bounding Boxes [South-West Corner, North-East Corner]
 # Strategic tanker chokepoints and major oil shipping routes
@@ -252,6 +254,11 @@ MAP_ZOOM_LEVEL = 7
 PORT_MARKER_RADIUS = 8
 VESSEL_MARKER_RADIUS = 6
 
+# Client-side vessel clustering (supercluster)
+ENABLE_VESSEL_CLUSTERING = os.getenv("ENABLE_VESSEL_CLUSTERING", "true").lower() == "true"
+CLUSTER_MAX_ZOOM = int(os.getenv("CLUSTER_MAX_ZOOM", "14"))  # Above this zoom every vessel is drawn
+CLUSTER_RADIUS = int(os.getenv("CLUSTER_RADIUS", "60"))  # Cluster radius in pixels
+
 # Ship Type Descriptions
 SHIP_TYPE_NAMES = {
     70: "Cargo",
@@ -4,7 +4,7 @@ Vessel data model for representing tracked ships.
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List
+from typing import AbstractSet, Optional, List
 
 
 @dataclass
@@ -193,7 +193,7 @@ class Vessel:
         """Check if vessel has valid position data."""
         return self.lat is not None and self.lon is not None
     
-    def is_tanker(self, tanker_types: list) -> bool:
+    def is_tanker(self, tanker_types: AbstractSet[int]) -> bool:
         """Check if vessel is a tanker type."""
         return self.ship_type in tanker_types if self.ship_type else False
     
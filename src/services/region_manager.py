@@ -7,6 +7,8 @@ and handling region-based operations.
 
 import json
 import logging
+from bisect import bisect_left, bisect_right
+from math import floor, radians, sin, cos, sqrt, atan2
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
@@ -17,6 +19,21 @@ from models.vessel import Vessel
 
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE_LAT = radians(1) * EARTH_RADIUS_KM  # Great-circle length of one degree of latitude
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calculate distance between two points in km."""
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * atan2(sqrt(a), sqrt(1-a))
+    
+    return EARTH_RADIUS_KM * c
+
 
 class RegionManager:
     """
@@ -48,6 +65,13 @@ class RegionManager:
         self.current_region: Optional[str] = self._load_current_region()
         self.region_history: List[Dict] = self._load_region_history()
         
+        # Ports sorted by latitude for get_nearby_ports range queries
+        self._port_index: List[Tuple[float, int, Port]] = self._build_port_index()
+        self._port_lats: List[float] = [entry[0] for entry in self._port_index]
+        
+        # Region bounds bucketed by whole degree of latitude for _find_region
+        self._region_bands: Dict[int, List[Tuple[float, float, float, float, str]]] = self._build_region_bands()
+        
         logger.info(f"RegionManager initialized with {len(self.regions)} regions")
         if self.current_region:
             logger.info(f"Current region: {self.current_region}")
@@ -75,6 +99,46 @@ class RegionManager:
         
         return regions
     
+    def _build_port_index(self) -> List[Tuple[float, int, Port]]:
+        """
+        Build a latitude-sorted index of every port.
+        
+        Each entry keeps the port's position in region order so results
+        at equal distance come back in the same order as a full scan.
+        """
+        ports = [
+            port
+            for region in self.regions.values()
+            for port in region.ports
+        ]
+        return sorted(
+            ((port.lat, seq, port) for seq, port in enumerate(ports)),
+            key=lambda entry: entry[0]
+        )
+    
+    def _build_region_bands(self) -> Dict[int, List[Tuple[float, float, float, float, str]]]:
+        """
+        Bucket region bounds by whole degree of latitude.
+        
+        A point only has to be tested against the regions overlapping its
+        band. Bands keep regions in configuration order, so the first match
+        is the region a scan over all of them would find.
+        """
+        bands: Dict[int, List[Tuple[float, float, float, float, str]]] = {}
+        for name, region in self.regions.items():
+            (south, west), (north, east) = region.bounds
+            box = (south, west, north, east, name)
+            for band in range(floor(south), floor(north) + 1):
+                bands.setdefault(band, []).append(box)
+        return bands
+    
+    def _find_region(self, lat: float, lon: float) -> Optional[str]:
+        """Return the first region containing the point, or None."""
+        for south, west, north, east, name in self._region_bands.get(floor(lat), ()):
+            if south <= lat <= north and west <= lon <= east:
+                return name
+        return None
+    
     def _load_current_region(self) -> Optional[str]:
         """Load the currently selected region from persistence."""
         try:
@@ -204,14 +268,15 @@ class RegionManager:
         if not region_name or region_name not in self.regions:
             return vessels
         
-        region = self.regions[region_name]
-        filtered = {}
-        
-        for mmsi, vessel in vessels.items():
-            if vessel.has_position() and region.contains_point(vessel.lat, vessel.lon):
-                filtered[mmsi] = vessel
+        # Unpack the bounds once rather than per vessel in contains_point()
+        (south, west), (north, east) = self.regions[region_name].bounds
         
-        return filtered
+        return {
+            mmsi: vessel
+            for mmsi, vessel in vessels.items()
+            if vessel.has_position()
+            and south <= vessel.lat <= north and west <= vessel.lon <= east
+        }
     
     def get_vessels_by_region(self, vessels: Dict[int, Vessel]) -> Dict[str, List[Vessel]]:
         """
@@ -230,15 +295,8 @@ class RegionManager:
             if not vessel.has_position():
                 continue
             
-            found_region = False
-            for region_name, region in self.regions.items():
-                if region.contains_point(vessel.lat, vessel.lon):
-                    vessels_by_region[region_name].append(vessel)
-                    found_region = True
-                    break
-            
-            if not found_region:
-                vessels_by_region['unknown'].append(vessel)
+            region_name = self._find_region(vessel.lat, vessel.lon)
+            vessels_by_region[region_name or 'unknown'].append(vessel)
         
         return vessels_by_region
     
@@ -288,29 +346,19 @@ class RegionManager:
         Returns:
             List of (Port, distance) tuples, sorted by distance
         """
-        from math import radians, sin, cos, sqrt, atan2
-        
-        def haversine_distance(lat1, lon1, lat2, lon2):
-            """Calculate distance between two points in km."""
-            R = 6371  # Earth radius in km
-            
-            lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * atan2(sqrt(a), sqrt(1-a))
-            
-            return R * c
+        # Only ports inside the latitude band can be within range
+        band = max_distance_km / KM_PER_DEGREE_LAT
+        lo = bisect_left(self._port_lats, lat - band)
+        hi = bisect_right(self._port_lats, lat + band)
         
         nearby = []
-        for region in self.regions.values():
-            for port in region.ports:
-                distance = haversine_distance(lat, lon, port.lat, port.lon)
-                if distance <= max_distance_km:
-                    nearby.append((port, distance))
+        for port_lat, seq, port in self._port_index[lo:hi]:
+            distance = haversine_distance(lat, lon, port_lat, port.lon)
+            if distance <= max_distance_km:
+                nearby.append((distance, seq, port))
         
-        return sorted(nearby, key=lambda x: x[1])
+        nearby.sort(key=lambda x: (x[0], x[1]))
+        return [(port, distance) for distance, _, port in nearby]
     
     def validate_region(self, region_name: str) -> bool:
         """Check if a region name is valid."""
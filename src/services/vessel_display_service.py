@@ -1,12 +1,14 @@
 """
 Enhanced Vessel Display Service
 
-Provides rich vessel information formatting and enhanced popup generation
-with special focus on tanker-specific details.
+Provides rich vessel information formatting and the popup/tooltip fields
+the map renders, with special focus on tanker-specific details.
 """
 
 import logging
-from typing import Dict, Optional, List
+from html import escape
+from math import radians, sin, cos, sqrt, atan2
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
 
 from models.vessel import Vessel
@@ -172,8 +174,6 @@ class VesselDisplayService:
         if not vessel.has_position():
             return None
         
-        from math import radians, sin, cos, sqrt, atan2
-        
         def distance(lat1, lon1, lat2, lon2):
             R = 6371
             lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
@@ -192,255 +192,68 @@ class VesselDisplayService:
         
         return min(100, max(0, progress))
     
-    def generate_enhanced_popup(self, vessel: Vessel, 
-                               nearby_ports: List = None) -> str:
+    def generate_batch(self, vessels: List[Vessel],
+                       nearby_ports_map: Dict[int, List] = None) -> List[Dict]:
         """
-        Generate comprehensive HTML popup for vessel.
+        Get popup fields and tooltip for many vessels at once.
+        
+        The map renders popups in the browser from these fields, so only
+        the values are shipped per vessel instead of the full popup HTML.
+        The icon, tanker check and tanker class feed both the popup fields
+        and the tooltip; values that depend only on the ship type are
+        computed once per type in the batch.
         
         Args:
-            vessel: Vessel object
-            nearby_ports: List of nearby ports
+            vessels: Vessel objects
+            nearby_ports_map: (Port, distance) lists keyed by MMSI
             
         Returns:
-            HTML string for popup
+            List of display field dictionaries, in the order of vessels
         """
-        icon = self.get_vessel_icon(vessel)
-        ship_type_name = SHIP_TYPE_NAMES.get(vessel.ship_type, f"Type {vessel.ship_type}")
-        
-        # Determine vessel color based on type and status
-        if vessel.is_tanker(TANKER_TYPES):
+        nearby_ports_map = nearby_ports_map or {}
+        type_styles = {}
+        batch = []
+        
+        for vessel in vessels:
+            style = type_styles.get(vessel.ship_type)
+            if style is None:
+                style = type_styles[vessel.ship_type] = self._ship_type_display(vessel)
+            icon, header_color, is_tanker = style
+            tanker_class = self.get_tanker_class(vessel) if is_tanker else None
+            nearby_ports = nearby_ports_map.get(vessel.mmsi)
+            
+            # Leaflet renders tooltips as HTML, and names and destinations
+            # come straight from AIS broadcasts
+            tooltip = [f"{icon} {escape(vessel.name) if vessel.name else f'MMSI {vessel.mmsi}'}"]
+            if is_tanker and tanker_class:
+                tooltip.append(f"({tanker_class})")
+            if vessel.speed:
+                tooltip.append(f"{vessel.speed:.1f} kts")
+            if vessel.destination:
+                tooltip.append(f"→ {escape(vessel.destination)}")
+            
+            fields = {
+                'icon': icon,
+                'header_color': header_color,
+                'status': (self.NAV_STATUS_COLORS.get(vessel.navigational_status, ('#9E9E9E', 'Unknown'))
+                           if vessel.navigational_status is not None else None),
+                'tanker_class': tanker_class,
+                'capacity': self.estimate_cargo_capacity(vessel) if is_tanker else None,
+                'ports': ([[port.name, round(distance)] for port, distance in nearby_ports[:2]]
+                          if nearby_ports else None),
+                'tooltip': " | ".join(tooltip),
+            }
+            batch.append({key: value for key, value in fields.items() if value is not None})
+        
+        return batch
+    
+    def _ship_type_display(self, vessel: Vessel) -> Tuple[str, str, bool]:
+        """Get the icon, popup header color and tanker flag, which depend only on the ship type."""
+        is_tanker = vessel.is_tanker(TANKER_TYPES)
+        if is_tanker:
             header_color = "#C62828"  # Dark red for tankers
         elif vessel.ship_type in range(70, 80):
             header_color = "#F57C00"  # Orange for cargo
         else:
             header_color = "#1976D2"  # Blue for others
-        
-        html = f"""
-        <div style="font-family: 'Segoe UI', Arial, sans-serif; min-width: 280px; max-width: 350px;">
-            <div style="background: linear-gradient(135deg, {header_color} 0%, {header_color}CC 100%);
-                        color: white; padding: 12px; margin: -10px -10px 10px -10px; 
-                        border-radius: 5px 5px 0 0;">
-                <h3 style="margin: 0; font-size: 16px; font-weight: 600;">
-                    {icon} {vessel.name or f'MMSI {vessel.mmsi}'}
-                </h3>
-                <div style="font-size: 11px; opacity: 0.9; margin-top: 4px;">
-                    {ship_type_name}
-                </div>
-            </div>
-            
-            <table style="font-size: 12px; width: 100%; border-collapse: collapse;">
-        """
-        
-        # Identification Section
-        html += f"""
-                <tr style="background: #f5f5f5;">
-                    <td colspan="2" style="padding: 6px 8px; font-weight: 600; border-bottom: 2px solid #ddd;">
-                        📋 Identification
-                    </td>
-                </tr>
-                <tr>
-                    <td style="padding: 4px 8px; color: #666; width: 40%;">MMSI:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{vessel.mmsi}</td>
-                </tr>
-        """
-        
-        if vessel.imo:
-            html += f"""
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">IMO:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{vessel.imo}</td>
-                </tr>
-            """
-        
-        if vessel.callsign:
-            html += f"""
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Callsign:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{vessel.callsign}</td>
-                </tr>
-            """
-        
-        # Tanker-Specific Information
-        if vessel.is_tanker(TANKER_TYPES):
-            tanker_class = self.get_tanker_class(vessel)
-            capacity = self.estimate_cargo_capacity(vessel)
-            
-            html += f"""
-                <tr style="background: #fff3e0;">
-                    <td colspan="2" style="padding: 6px 8px; font-weight: 600; border-bottom: 2px solid #ff9800; color: #e65100;">
-                        🛢️ Tanker Details
-                    </td>
-                </tr>
-            """
-            
-            if tanker_class:
-                html += f"""
-                <tr style="background: #fffaf0;">
-                    <td style="padding: 4px 8px; color: #666;">Class:</td>
-                    <td style="padding: 4px 8px; font-weight: 600; color: #e65100;">{tanker_class}</td>
-                </tr>
-                """
-            
-            if capacity:
-                html += f"""
-                <tr style="background: #fffaf0;">
-                    <td style="padding: 4px 8px; color: #666;">Capacity:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{capacity}</td>
-                </tr>
-                """
-        
-        # Navigation Section
-        html += f"""
-                <tr style="background: #e3f2fd;">
-                    <td colspan="2" style="padding: 6px 8px; font-weight: 600; border-bottom: 2px solid #2196f3;">
-                        🧭 Navigation
-                    </td>
-                </tr>
-        """
-        
-        speed_info = self.format_speed_info(vessel)
-        html += f"""
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Speed:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{vessel.speed or 'N/A'} knots</td>
-                </tr>
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Course:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{vessel.course or 'N/A'}°</td>
-                </tr>
-        """
-        
-        if vessel.heading is not None:
-            html += f"""
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Heading:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{vessel.heading}°</td>
-                </tr>
-            """
-        
-        if vessel.navigational_status is not None:
-            color, status_text = self.NAV_STATUS_COLORS.get(
-                vessel.navigational_status, 
-                ('#9E9E9E', 'Unknown')
-            )
-            html += f"""
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Status:</td>
-                    <td style="padding: 4px 8px; font-weight: 500; color: {color};">
-                        ● {status_text}
-                    </td>
-                </tr>
-            """
-        
-        # Voyage Section
-        voyage_info = self.format_voyage_info(vessel)
-        html += f"""
-                <tr style="background: #f3e5f5;">
-                    <td colspan="2" style="padding: 6px 8px; font-weight: 600; border-bottom: 2px solid #9c27b0;">
-                        🗺️ Voyage
-                    </td>
-                </tr>
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Destination:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{voyage_info['destination']}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">ETA:</td>
-                    <td style="padding: 4px 8px;">{voyage_info['eta']}</td>
-                </tr>
-        """
-        
-        # Nearby Ports
-        if nearby_ports:
-            html += f"""
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Nearby:</td>
-                    <td style="padding: 4px 8px; font-size: 11px;">
-            """
-            for port, distance in nearby_ports[:2]:  # Show top 2
-                html += f"⚓ {port.name} ({distance:.0f}km)<br>"
-            html += "</td></tr>"
-        
-        # Dimensions Section
-        if vessel.length or vessel.width or vessel.draught:
-            html += f"""
-                <tr style="background: #e8f5e9;">
-                    <td colspan="2" style="padding: 6px 8px; font-weight: 600; border-bottom: 2px solid #4caf50;">
-                        📏 Dimensions
-                    </td>
-                </tr>
-            """
-            
-            if vessel.length and vessel.width:
-                html += f"""
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Size:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{vessel.length:.0f}m × {vessel.width:.0f}m</td>
-                </tr>
-                """
-            
-            if vessel.draught:
-                html += f"""
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Draught:</td>
-                    <td style="padding: 4px 8px; font-weight: 500;">{vessel.draught:.1f}m</td>
-                </tr>
-                """
-        
-        # Position & Tracking
-        html += f"""
-                <tr style="background: #fce4ec;">
-                    <td colspan="2" style="padding: 6px 8px; font-weight: 600; border-bottom: 2px solid #e91e63;">
-                        📍 Position & Tracking
-                    </td>
-                </tr>
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Position:</td>
-                    <td style="padding: 4px 8px; font-size: 11px; font-family: monospace;">
-                        {vessel.lat:.4f}°, {vessel.lon:.4f}°
-                    </td>
-                </tr>
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Updates:</td>
-                    <td style="padding: 4px 8px;">{vessel.update_count}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">Last seen:</td>
-                    <td style="padding: 4px 8px;">{vessel.last_update or 'N/A'}</td>
-                </tr>
-        """
-        
-        if vessel.first_seen:
-            html += f"""
-                <tr>
-                    <td style="padding: 4px 8px; color: #666;">First seen:</td>
-                    <td style="padding: 4px 8px;">{vessel.first_seen}</td>
-                </tr>
-            """
-        
-        html += """
-            </table>
-        </div>
-        """
-        
-        return html
-    
-    def generate_vessel_tooltip(self, vessel: Vessel) -> str:
-        """Generate concise tooltip for vessel marker."""
-        icon = self.get_vessel_icon(vessel)
-        name = vessel.name or f"MMSI {vessel.mmsi}"
-        
-        parts = [f"{icon} {name}"]
-        
-        if vessel.is_tanker(TANKER_TYPES):
-            tanker_class = self.get_tanker_class(vessel)
-            if tanker_class:
-                parts.append(f"({tanker_class})")
-        
-        if vessel.speed:
-            parts.append(f"{vessel.speed:.1f} kts")
-        
-        if vessel.destination:
-            parts.append(f"→ {vessel.destination}")
-        
-        return " | ".join(parts)
+        return self.get_vessel_icon(vessel), header_color, is_tanker
@@ -19,13 +19,14 @@ Date: 2025
 """
 
 import asyncio
+import json
 import logging
 import signal
 import sys
 import threading
 import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 from config import (
     AUTO_MAP_UPDATE_SECONDS, 
@@ -35,6 +36,7 @@ from config import (
     MAX_TRACKED_SHIPS, 
     MESSAGE_BATCH_SIZE,
     REGIONS, 
+    TANKER_TYPES,
     UPDATE_INTERVAL,
     USE_DATABASE_CACHE
 )
@@ -208,7 +210,21 @@ class TankersTracker:
         Returns:
             Dictionary of vessels in region
         """
-        all_vessels = self.vessel_service.get_active_vessels()
+        return self._scan_region(expand_margin)[0]
+    
+    def _scan_region(self, expand_margin: float = 0.0) -> Tuple[Dict[int, Vessel], int]:
+        """
+        Collect vessels in the tracked region and count tankers among them.
+        
+        Args:
+            expand_margin: Degrees to expand the search area (for better coverage)
+        
+        Returns:
+            Tuple of (vessels in region, tanker count)
+        """
+        # Snapshot the cache in one C-level copy (the AIS thread keeps adding
+        # to it) instead of building a filtered dict of active vessels first
+        all_vessels = list(self.vessel_service.get_all_vessels().items())
         
         # Region bounds: [[south, west], [north, east]]
         south, west = self.region_bounds[0]
@@ -221,19 +237,21 @@ class TankersTracker:
         east += expand_margin
         
         vessels_in_region = {}
-        for mmsi, vessel in all_vessels.items():
-            if not vessel.has_position():
+        tanker_count = 0
+        for mmsi, vessel in all_vessels:
+            # Read each coordinate once; None means no position yet
+            lat = vessel.lat
+            lon = vessel.lon
+            if lat is None or lon is None:
                 continue
-                
-            # Check if vessel is within bounds
-            in_latitude = south <= vessel.lat <= north
-            in_longitude = west <= vessel.lon <= east
             
-            if in_latitude and in_longitude:
+            if south <= lat <= north and west <= lon <= east:
                 vessels_in_region[mmsi] = vessel
+                if vessel.ship_type in TANKER_TYPES:
+                    tanker_count += 1
         
-        return vessels_in_region
-        
+        return vessels_in_region, tanker_count
+    
     def _on_static_data(self, vessel: Vessel):
         """Callback for when vessel static data is received."""
         # Update vessel in service (handles caching and database)
@@ -252,9 +270,13 @@ class TankersTracker:
     
     def _update_map(self):
         """Update the map with current vessel positions (vessels in/near region)."""
-        vessels = self._get_vessels_in_region(expand_margin=0.5)  # Slightly expanded for updates
+        # AIS callbacks still in flight after stop() must not touch the map
+        if not self.running:
+            return
+        vessels, tanker_count = self._scan_region(expand_margin=0.5)  # Slightly expanded for updates
         if len(vessels) > 0:
-            self.map_generator.generate_map(vessels, auto_open=False)
+            self.map_generator.generate_map(vessels, auto_open=False,
+                                            active_count=len(vessels), tanker_count=tanker_count)
             self.last_map_update = time.time()
         else:
             # If still no vessels, just update timestamp
@@ -264,13 +286,16 @@ class TankersTracker:
         """Background thread for automatic map updates."""
         while self.running:
             time.sleep(self.auto_map_update_seconds)
+            if not self.running:
+                break
             
             # Only update if enough time has passed
             if time.time() - self.last_map_update > self.auto_map_update_seconds:
-                vessels = self._get_vessels_in_region(expand_margin=0.5)
+                vessels, tanker_count = self._scan_region(expand_margin=0.5)
                 if len(vessels) > 0:
                     logger.info("[AUTO-UPDATE] Refreshing map...")
-                    self.map_generator.generate_map(vessels, auto_open=False)
+                    self.map_generator.generate_map(vessels, auto_open=False,
+                                                    active_count=len(vessels), tanker_count=tanker_count)
                 self.last_map_update = time.time()
     
     async def _run_ais_connection(self) -> None:
@@ -344,14 +369,15 @@ Region bounds: {self.region_bounds}
         """Create and display initial map (showing vessels in region or nearby)."""
         try:
             logger.info("Creating initial map...")
-            vessels_in_region = self._get_vessels_in_region()
+            vessels_in_region, tanker_count = self._scan_region()
             
             # If no vessels in exact region, expand search to show nearby vessels
             if len(vessels_in_region) == 0:
                 logger.info("No vessels in exact region, expanding search area...")
-                vessels_in_region = self._get_vessels_in_region(expand_margin=2.0)  # Expand by 2 degrees
+                vessels_in_region, tanker_count = self._scan_region(expand_margin=2.0)  # Expand by 2 degrees
             
-            self.map_generator.generate_map(vessels_in_region, auto_open=self.auto_open_browser)
+            self.map_generator.generate_map(vessels_in_region, auto_open=self.auto_open_browser,
+                                            active_count=len(vessels_in_region), tanker_count=tanker_count)
             
             if len(vessels_in_region) > 0:
                 logger.info(f"Initial map created with {len(vessels_in_region):,} vessels in/near region")
@@ -393,15 +419,21 @@ Region bounds: {self.region_bounds}
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
         
+        # Whether or not a final map was written, no deferred update may
+        # fire once this tracker has stopped
+        self.map_generator.cancel_pending()
+        
         logger.info("✅ Tanker tracker stopped successfully")
     
     def _generate_final_map(self) -> None:
         """Generate final map with vessels in current region."""
         try:
-            vessels_in_region = self._get_vessels_in_region()
+            vessels_in_region, tanker_count = self._scan_region()
             if len(vessels_in_region) > 0:
                 logger.info(f"Generating final map with {len(vessels_in_region):,} vessels in region...")
-                self.map_generator.generate_map(vessels_in_region, auto_open=False)
+                self.map_generator.generate_map(vessels_in_region, auto_open=False,
+                                                active_count=len(vessels_in_region), tanker_count=tanker_count,
+                                                force=True)
         except Exception as e:
             logger.error(f"Failed to generate final map: {e}")
     
@@ -477,8 +509,6 @@ def main():
     if not selected_region:
         # Try to load from saved preference
         try:
-            from pathlib import Path
-            import json
             region_file = Path("data/current_region.json")
             if region_file.exists():
                 with open(region_file, 'r') as f:
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for MapGenerator's coalescing of map regenerations.
+"""
+
+import time
+import utils.map_generator as map_generator
+from utils.map_generator import MapGenerator
+
+INTERVAL = 0.2
+
+
+def _recording_generator():
+    """Create a generator whose map writes are recorded instead of rendered."""
+    generator = MapGenerator('suez_canal', 'test_map.html')
+    writes = []
+
+    def record_write(vessels, active_count, tanker_count):
+        # Stamp the write time as _write_map() does
+        generator._last_generated = time.monotonic()
+        writes.append(vessels)
+
+    generator._write_map = record_write
+    return generator, writes
+
+
+def test_generate_map_coalesces_bursts():
+    """Calls within the interval collapse into one trailing write of the latest vessels."""
+    original_interval = map_generator.MAP_MIN_REGENERATE_SECONDS
+    map_generator.MAP_MIN_REGENERATE_SECONDS = INTERVAL
+    try:
+        generator, writes = _recording_generator()
+        first, second, third, fourth = {1: 'a'}, {1: 'b'}, {1: 'c'}, {1: 'd'}
+
+        # The first call writes at once
+        generator.generate_map(first)
+        assert writes == [first]
+
+        # A burst is deferred to a single write with the last arguments
+        generator.generate_map(second)
+        generator.generate_map(third)
+        assert writes == [first]
+        time.sleep(INTERVAL * 3)
+        assert writes == [first, third]
+
+        # Once the interval has passed the next call writes at once again;
+        # force writes within it and supersedes the deferred call
+        generator.generate_map(first)
+        generator.generate_map(second)
+        generator.generate_map(fourth, force=True)
+        assert writes == [first, third, first, fourth]
+        time.sleep(INTERVAL * 3)
+        assert writes == [first, third, first, fourth]
+    finally:
+        map_generator.MAP_MIN_REGENERATE_SECONDS = original_interval
+
+
+def test_cancel_pending_drops_deferred_write():
+    """cancel_pending() stops a deferred write from ever running."""
+    original_interval = map_generator.MAP_MIN_REGENERATE_SECONDS
+    map_generator.MAP_MIN_REGENERATE_SECONDS = INTERVAL
+    try:
+        generator, writes = _recording_generator()
+        generator.generate_map({1: 'a'})
+        generator.generate_map({1: 'b'})
+        generator.cancel_pending()
+        time.sleep(INTERVAL * 3)
+        assert writes == [{1: 'a'}]
+    finally:
+        map_generator.MAP_MIN_REGENERATE_SECONDS = original_interval
+
+
+if __name__ == "__main__":
+    test_generate_map_coalesces_bursts()
+    test_cancel_pending_drops_deferred_write()
+    print("✅ Map regenerations are coalesced")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for RegionManager's indexed lookups, checked against a full scan.
+"""
+
+import tempfile
+from services.region_manager import RegionManager, haversine_distance
+
+# Probe points around and between the configured regions
+PROBE_LATS = [lat / 4 for lat in range(-40, 241)]
+PROBE_LONS = [lon / 2 for lon in range(-200, 301, 3)]
+
+
+def _make_manager(data_dir: str) -> RegionManager:
+    """Create a RegionManager that keeps its state files in data_dir."""
+    return RegionManager(data_dir=data_dir)
+
+
+def test_nearby_ports_match_full_scan():
+    """get_nearby_ports() returns the same ports, in the same order, as a scan of every port."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = _make_manager(data_dir)
+        ports = [port for region in manager.regions.values() for port in region.ports]
+        assert ports
+
+        # Probe at every port and next to it, plus the probe grid
+        points = [(port.lat, port.lon) for port in ports]
+        points += [(port.lat + 0.9, port.lon - 0.4) for port in ports]
+        points += [(lat, lon) for lat in PROBE_LATS[::8] for lon in PROBE_LONS[::4]]
+
+        for max_distance in (5, 50, 100, 250):
+            for lat, lon in points:
+                expected = []
+                for seq, port in enumerate(ports):
+                    distance = haversine_distance(lat, lon, port.lat, port.lon)
+                    if distance <= max_distance:
+                        expected.append((distance, seq, port))
+                expected.sort(key=lambda x: (x[0], x[1]))
+
+                nearby = manager.get_nearby_ports(lat, lon, max_distance_km=max_distance)
+                assert [(port.name, distance) for port, distance in nearby] == \
+                    [(port.name, distance) for distance, _, port in expected], (lat, lon, max_distance)
+
+
+def test_find_region_matches_full_scan():
+    """_find_region() returns the first configured region containing the point."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = _make_manager(data_dir)
+
+        # Probe the grid plus every region's corners, edges and just outside them
+        points = [(lat, lon) for lat in PROBE_LATS for lon in PROBE_LONS]
+        for region in manager.regions.values():
+            (south, west), (north, east) = region.bounds
+            for lat in (south - 0.01, south, (south + north) / 2, north, north + 0.01):
+                for lon in (west - 0.01, west, (west + east) / 2, east, east + 0.01):
+                    points.append((lat, lon))
+
+        found = 0
+        for lat, lon in points:
+            expected = None
+            for name, region in manager.regions.items():
+                (south, west), (north, east) = region.bounds
+                if south <= lat <= north and west <= lon <= east:
+                    expected = name
+                    break
+            assert manager._find_region(lat, lon) == expected, (lat, lon)
+            found += expected is not None
+        assert found
+
+
+if __name__ == "__main__":
+    test_nearby_ports_match_full_scan()
+    test_find_region_matches_full_scan()
+    print("✅ RegionManager lookups match a full scan")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for VesselDatabase batch saves and reads, on a temporary database.
+"""
+
+import os
+import tempfile
+from utils.vessel_database import VesselDatabase
+from models.vessel import Vessel
+
+
+def _make_vessel(mmsi: int, **fields) -> Vessel:
+    """Create a positioned test vessel."""
+    vessel = Vessel(mmsi=mmsi, name=f"TEST {mmsi}", ship_type=80, lat=25.0, lon=55.0,
+                    last_update=f"12:00:{mmsi % 60:02d}", update_count=1)
+    for name, value in fields.items():
+        setattr(vessel, name, value)
+    return vessel
+
+
+def test_bulk_save_writes_batch():
+    """bulk_save() inserts new vessels and replaces existing ones."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        db = VesselDatabase(os.path.join(data_dir, "vessels.db"))
+        db.bulk_save({mmsi: _make_vessel(mmsi) for mmsi in (1, 2, 3)})
+        db.bulk_save({2: _make_vessel(2, name="RENAMED"), 4: _make_vessel(4)})
+
+        assert sorted(db.get_statistics().items()) == [('tankers', 4), ('total_vessels', 4),
+                                                       ('with_position', 4)]
+        assert db.get_vessel(2).name == "RENAMED"
+        assert db.get_vessel(3).name == "TEST 3"
+        db.close()
+
+
+def test_bulk_save_falls_back_to_single_rows():
+    """A row SQLite rejects fails on its own instead of losing the whole batch."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        db = VesselDatabase(os.path.join(data_dir, "vessels.db"))
+        # Too large for an SQLite INTEGER, so executemany() fails on this row
+        bad = _make_vessel(2, imo=2 ** 70)
+        db.bulk_save({1: _make_vessel(1), 2: bad, 3: _make_vessel(3)})
+
+        assert db.get_vessel(1) is not None
+        assert db.get_vessel(2) is None
+        assert db.get_vessel(3) is not None
+        assert db.get_statistics()['total_vessels'] == 2
+        db.close()
+
+
+def test_iter_all_vessels_round_trip():
+    """iter_all_vessels() unpacks every column into its own field, newest first."""
+    # A distinct value per field, so a shifted column cannot go unnoticed
+    full = Vessel(
+        mmsi=211000001, lat=25.5, lon=55.25, speed=12.5, course=181.0, heading=182,
+        rot=-3.0, navigational_status=5, position_accuracy=1,
+        name="FULL VESSEL", imo=9000001, callsign="CALL1", ship_type=84,
+        length=333.0, width=60.0, draught=20.5,
+        dimension_to_bow=300, dimension_to_stern=33, dimension_to_port=25, dimension_to_starboard=35,
+        destination="ROTTERDAM", eta="10-01 12:00", cargo="CRUDE", deadweight=300000, gross_tonnage=160000,
+        last_update="12:30:00", first_seen="08:00:00", update_count=42
+    )
+    older = _make_vessel(7, last_update="11:00:00")
+    sparse = Vessel(mmsi=8)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        db = VesselDatabase(os.path.join(data_dir, "vessels.db"))
+        db.bulk_save({v.mmsi: v for v in (older, sparse, full)})
+
+        vessels = list(db.iter_all_vessels())
+        # Vessels never updated (NULL last_update) come last
+        assert vessels == [full, older, sparse]
+        assert db.get_all_vessels() == vessels
+        assert db.get_vessel(full.mmsi) == full
+        db.close()
+
+
+if __name__ == "__main__":
+    test_bulk_save_writes_batch()
+    test_bulk_save_falls_back_to_single_rows()
+    test_iter_all_vessels_round_trip()
+    print("✅ VesselDatabase batch saves and reads work")
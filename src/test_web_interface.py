@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the web server's conditional request handling.
+"""
+
+import os
+import tempfile
+from web_interface import TankersTrackerHandler
+
+ETAG = 'W/"18ded73bfd57fdd7-4157"'
+
+
+def test_etag_matches_if_none_match():
+    """If-None-Match is parsed as a list of tags with weak comparison."""
+    matches = TankersTrackerHandler._etag_matches
+
+    # Same tag, with or without the weak prefix, alone or in a list
+    assert matches(ETAG, ETAG)
+    assert matches(ETAG, '"18ded73bfd57fdd7-4157"')
+    assert matches(ETAG, '"other", W/"18ded73bfd57fdd7-4157"')
+    assert matches(ETAG, '  W/"18ded73bfd57fdd7-4157"  ,"other"')
+    assert matches(ETAG, '*')
+
+    # No header, other tags, and tags that merely contain or are contained in it
+    assert not matches(ETAG, None)
+    assert not matches(ETAG, '')
+    assert not matches(ETAG, '"other"')
+    assert not matches(ETAG, 'W/"18ded73bfd57fdd7-415"')
+    assert not matches(ETAG, 'W/"18ded73bfd57fdd7-41570"')
+    assert not matches(ETAG, 'W/"x-W/"18ded73bfd57fdd7-4157""')
+
+
+def test_file_etag():
+    """File ETags are weak, change with the file, and are None for non-files."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tankers_map_vessels.json')
+        with open(path, 'w') as f:
+            f.write('[]')
+        etag = TankersTrackerHandler._file_etag(path)
+        assert etag.startswith('W/"') and etag.endswith('"')
+        assert TankersTrackerHandler._file_etag(path) == etag
+
+        with open(path, 'w') as f:
+            f.write('[1]')
+        assert TankersTrackerHandler._file_etag(path) != etag
+
+        assert TankersTrackerHandler._file_etag(directory) is None
+        assert TankersTrackerHandler._file_etag(os.path.join(directory, 'missing.json')) is None
+
+
+if __name__ == "__main__":
+    test_etag_matches_if_none_match()
+    test_file_etag()
+    print("✅ Conditional request handling works")
@@ -3,17 +3,32 @@ Map generator for visualizing vessel positions using Folium.
 """
 
 import folium
+import gzip
+import hashlib
+import json
 import webbrowser
 import os
+import shutil
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import logging
 
+from branca.element import MacroElement
+from folium.elements import JSCSSMixin
+from jinja2 import Template
+
 from config import (REGIONS, PORTS, MAP_TILES, MAP_ZOOM_LEVEL,
                    PORT_MARKER_RADIUS, VESSEL_MARKER_RADIUS,
+                   ENABLE_VESSEL_CLUSTERING, CLUSTER_MAX_ZOOM, CLUSTER_RADIUS,
                    SHIP_TYPE_NAMES, TANKER_TYPES,
                    HTML_AUTO_REFRESH_SECONDS, ENABLE_AUTO_REFRESH,
-                   PAUSE_ON_USER_ACTIVITY, USER_ACTIVITY_TIMEOUT)
+                   PAUSE_ON_USER_ACTIVITY, USER_ACTIVITY_TIMEOUT, GZIP_MAP_OUTPUT,
+                   MAP_MIN_REGENERATE_SECONDS, LOG_LEVEL)
 from models.vessel import Vessel
 from models.region import Port
 
@@ -28,6 +43,333 @@ except ImportError:
     ENHANCED_DISPLAY = False
     logger.warning("Enhanced display services not available, using basic display")
 
+# Map pane holding the vessel canvas, between overlays (400) and markers (600)
+VESSEL_PANE = 'vessels'
+VESSEL_PANE_Z_INDEX = 450
+
+SUPERCLUSTER_JS = "https://unpkg.com/supercluster@8.0.1/dist/supercluster.min.js"
+
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MB
+GZIP_LEVEL = 6
+
+# Static assets the generated map links to in place
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+REFRESH_UI_SCRIPT = 'refresh_ui.js'
+INTERFACE_STYLESHEET = 'map_interface.css'
+
+# Decimal places kept for vessel coordinates in the page (~0.1 m, below AIS precision)
+COORD_DECIMALS = 6
+
+# Placeholders in the cached base page, filled in on every refresh
+VESSEL_DATA_MARKER = '/* VESSEL_DATA_INJECT */'
+INTERFACE_MARKER = '<!-- MAP_INTERFACE_INJECT -->'
+
+@lru_cache(maxsize=None)
+def _ship_type_style(ship_type: Optional[int]) -> Tuple[str, str, bool]:
+    """
+    Get the marker color, display name and tanker flag for an AIS ship type code.
+    
+    There are only a few dozen ship type codes, so this is computed once per
+    code instead of once per vessel.
+    """
+    is_tanker = bool(ship_type) and ship_type in TANKER_TYPES
+    color = 'darkred' if is_tanker else 'orange'
+    return color, SHIP_TYPE_NAMES.get(ship_type, f"Type {ship_type}"), is_tanker
+
+
+class VesselLayer(JSCSSMixin, MacroElement):
+    """
+    Renders every vessel marker from one embedded JSON array.
+    
+    Folium would otherwise build (and render through Jinja) a CircleMarker,
+    Popup and Tooltip object per vessel; here the whole fleet costs one
+    json.dumps() and one template render. Popup HTML is built in the browser
+    from each record's fields the first time that popup is opened.
+    
+    Only vessels inside the viewport are drawn: with clustering enabled they
+    are indexed by supercluster in the browser, otherwise filtered by the
+    padded map bounds, walking only the visible band of the latitude-sorted
+    records. Each moveend adds and removes just the difference from the
+    previous view. Vessel markers are keyed by MMSI, so a new snapshot moves
+    and restyles existing markers instead of recreating them.
+    """
+    
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            {{ this._parent.get_name() }}.createPane('{{ this.pane }}').style.zIndex = {{ this.pane_z_index }};
+            // All vessel markers draw into this one canvas
+            var {{ this.get_name() }}_renderer = L.canvas({padding: 0.5, pane: '{{ this.pane }}'});
+            var {{ this.get_name() }}_data = {{ this.data|safe }};
+            function {{ this.get_name() }}_popup(d) {
+                function esc(value) {
+                    return String(value).replace(/[&<>"]/g, function(c) {
+                        return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c];
+                    });
+                }
+                function section(title, background, border, color) {
+                    return '<tr style="background: ' + background + ';">' +
+                        '<td colspan="2" style="padding: 6px 8px; font-weight: 600; ' +
+                        'border-bottom: 2px solid ' + border + ';' + (color ? ' color: ' + color + ';' : '') + '">' +
+                        title + '</td></tr>';
+                }
+                function row(label, value, valueStyle, rowStyle) {
+                    return '<tr' + (rowStyle ? ' style="' + rowStyle + '"' : '') + '>' +
+                        '<td style="padding: 4px 8px; color: #666;">' + label + ':</td>' +
+                        '<td style="padding: 4px 8px; ' + (valueStyle == null ? 'font-weight: 500;' : valueStyle) + '">' +
+                        value + '</td></tr>';
+                }
+                
+                var color = d.header_color || '#d32f2f';
+                var html = [
+                    '<div style="font-family: Segoe UI, Arial, sans-serif; min-width: 280px; max-width: 350px;">',
+                    '<div style="background: linear-gradient(135deg, ' + color + ' 0%, ' + color + 'CC 100%); ' +
+                        'color: white; padding: 12px; margin: -10px -10px 10px -10px; border-radius: 5px 5px 0 0;">',
+                    '<h3 style="margin: 0; font-size: 16px; font-weight: 600;">' +
+                        (d.icon || '🛢️') + ' ' + esc(d.name || 'MMSI ' + d.mmsi) + '</h3>',
+                    '<div style="font-size: 11px; opacity: 0.9; margin-top: 4px;">' + esc(d.type_name) + '</div>',
+                    '</div>',
+                    '<table style="font-size: 12px; width: 100%; border-collapse: collapse;">',
+                    section('📋 Identification', '#f5f5f5', '#ddd'),
+                    row('MMSI', d.mmsi)
+                ];
+                if (d.imo) html.push(row('IMO', d.imo));
+                if (d.callsign) html.push(row('Callsign', esc(d.callsign)));
+                
+                if (d.tanker) {
+                    html.push(section('🛢️ Tanker Details', '#fff3e0', '#ff9800', '#e65100'));
+                    if (d.tanker_class) {
+                        html.push(row('Class', d.tanker_class, 'font-weight: 600; color: #e65100;', 'background: #fffaf0;'));
+                    }
+                    if (d.capacity) html.push(row('Capacity', d.capacity, null, 'background: #fffaf0;'));
+                }
+                
+                html.push(section('🧭 Navigation', '#e3f2fd', '#2196f3'));
+                html.push(row('Speed', (d.speed || 'N/A') + ' knots'));
+                html.push(row('Course', (d.course || 'N/A') + '°'));
+                if (d.heading != null) html.push(row('Heading', d.heading + '°'));
+                if (d.status) {
+                    html.push(row('Status', '● ' + d.status[1], 'font-weight: 500; color: ' + d.status[0] + ';'));
+                }
+                
+                html.push(section('🗺️ Voyage', '#f3e5f5', '#9c27b0'));
+                html.push(row('Destination', esc(d.destination || 'Unknown')));
+                html.push(row('ETA', esc(d.eta || 'Not available'), ''));
+                if (d.ports) {
+                    html.push(row('Nearby', d.ports.map(function(p) {
+                        return '⚓ ' + esc(p[0]) + ' (' + p[1] + 'km)';
+                    }).join('<br>'), 'font-size: 11px;'));
+                }
+                
+                if (d.length || d.width || d.draught) {
+                    html.push(section('📏 Dimensions', '#e8f5e9', '#4caf50'));
+                    if (d.length && d.width) {
+                        html.push(row('Size', d.length.toFixed(0) + 'm × ' + d.width.toFixed(0) + 'm'));
+                    }
+                    if (d.draught) html.push(row('Draught', d.draught.toFixed(1) + 'm'));
+                }
+                
+                html.push(section('📍 Position & Tracking', '#fce4ec', '#e91e63'));
+                html.push(row('Position', d.lat.toFixed(4) + '°, ' + d.lon.toFixed(4) + '°',
+                              'font-size: 11px; font-family: monospace;'));
+                html.push(row('Updates', d.updates, ''));
+                html.push(row('Last seen', esc(d.last_seen || 'N/A'), ''));
+                if (d.first_seen) html.push(row('First seen', esc(d.first_seen), ''));
+                
+                html.push('</table></div>');
+                return html.join('');
+            }
+            function {{ this.get_name() }}_marker(d) {
+                var marker = L.circleMarker([d.lat, d.lon], {
+                    renderer: {{ this.get_name() }}_renderer,
+                    radius: {{ this.radius }},
+                    color: d.color,
+                    fill: true,
+                    fillColor: d.color,
+                    fillOpacity: 0.9
+                }).bindPopup(function(layer) { return {{ this.get_name() }}_popup(layer.vessel); }, {maxWidth: 350})
+                  .bindTooltip(d.tooltip, {sticky: true});
+                marker.vessel = d;
+                return marker;
+            }
+            // Point an existing marker at the vessel's record from a newer snapshot
+            function {{ this.get_name() }}_refresh(marker, d) {
+                if (marker.vessel !== d) {
+                    marker.vessel = d;
+                    marker.setLatLng([d.lat, d.lon]);
+                    marker.setStyle({color: d.color, fillColor: d.color});
+                    marker.setTooltipContent(d.tooltip);
+                    if (marker.isPopupOpen()) marker.getPopup().update();
+                }
+                return marker;
+            }
+            {% if this.cluster %}
+            var {{ this.get_name() }}_set = (function(map, makeMarker, refreshMarker) {
+                var index, data = [], shown = {};
+                
+                function clusterMarker(f) {
+                    var n = f.properties.point_count;
+                    var size = n < 100 ? 30 : (n < 1000 ? 38 : 46);
+                    var latlng = [f.geometry.coordinates[1], f.geometry.coordinates[0]];
+                    return L.marker(latlng, {
+                        icon: L.divIcon({
+                            html: '<div style="width:' + size + 'px;height:' + size + 'px;' +
+                                  'line-height:' + size + 'px;border-radius:50%;text-align:center;' +
+                                  'background:rgba(139,0,0,0.75);color:#fff;font:bold 12px Arial;">' +
+                                  f.properties.point_count_abbreviated + '</div>',
+                            className: 'vessel-cluster',
+                            iconSize: L.point(size, size)
+                        })
+                    }).on('click', function() {
+                        map.setView(latlng, index.getClusterExpansionZoom(f.properties.cluster_id));
+                    });
+                }
+                
+                function update() {
+                    var b = map.getBounds();
+                    var features = index.getClusters(
+                        [b.getWest(), b.getSouth(), b.getEast(), b.getNorth()],
+                        Math.round(map.getZoom())
+                    );
+                    var next = {};
+                    features.forEach(function(f) {
+                        var p = f.properties;
+                        if (p.cluster) {
+                            var key = 'c' + p.cluster_id;
+                            next[key] = shown[key] || clusterMarker(f).addTo(map);
+                        } else {
+                            var d = data[p.i], key = 'v' + d.mmsi;
+                            next[key] = shown[key] ? refreshMarker(shown[key], d) : makeMarker(d).addTo(map);
+                        }
+                    });
+                    for (var key in shown) {
+                        if (!next[key]) map.removeLayer(shown[key]);
+                    }
+                    shown = next;
+                }
+                
+                map.on('moveend', update);
+                
+                // Re-index a new vessel snapshot and redraw the current view
+                return function(records) {
+                    data = records;
+                    index = new Supercluster({
+                        radius: {{ this.cluster_radius }},
+                        maxZoom: {{ this.cluster_max_zoom }}
+                    });
+                    index.load(data.map(function(d, i) {
+                        return {
+                            type: 'Feature',
+                            properties: {i: i},
+                            geometry: {type: 'Point', coordinates: [d.lon, d.lat]}
+                        };
+                    }));
+                    // Cluster ids are not stable across indexes; vessel markers
+                    // are keyed by MMSI and updated in place
+                    for (var key in shown) {
+                        if (key.charAt(0) === 'c') {
+                            map.removeLayer(shown[key]);
+                            delete shown[key];
+                        }
+                    }
+                    update();
+                };
+            })({{ this._parent.get_name() }}, {{ this.get_name() }}_marker, {{ this.get_name() }}_refresh);
+            {% else %}
+            var {{ this.get_name() }}_set = (function(map, makeMarker, refreshMarker) {
+                var data = [], lats = new Float64Array(0), shown = {};
+                
+                // First index whose latitude is >= lat (data is sorted by latitude)
+                function lowerBound(lat) {
+                    var lo = 0, hi = lats.length;
+                    while (lo < hi) {
+                        var mid = (lo + hi) >> 1;
+                        if (lats[mid] < lat) lo = mid + 1; else hi = mid;
+                    }
+                    return lo;
+                }
+                
+                // Only vessels inside the (padded) viewport get a marker,
+                // kept per MMSI so a new snapshot updates it in place
+                function update() {
+                    // Read the view once; the loop below only compares numbers
+                    var bounds = map.getBounds().pad(0.25);
+                    var south = bounds.getSouth(), north = bounds.getNorth();
+                    var west = bounds.getWest(), east = bounds.getEast();
+                    var next = {};
+                    // Walk only the visible latitude band
+                    for (var i = lowerBound(south); i < lats.length && lats[i] <= north; i++) {
+                        var d = data[i];
+                        if (d.lon >= west && d.lon <= east) {
+                            var marker = shown[d.mmsi];
+                            next[d.mmsi] = marker ? refreshMarker(marker, d) : makeMarker(d).addTo(map);
+                        }
+                    }
+                    for (var key in shown) {
+                        if (!next[key]) map.removeLayer(shown[key]);
+                    }
+                    shown = next;
+                }
+                
+                map.on('moveend', update);
+                
+                return function(records) {
+                    data = records.slice().sort(function(a, b) { return a.lat - b.lat; });
+                    lats = Float64Array.from(data, function(d) { return d.lat; });
+                    update();
+                };
+            })({{ this._parent.get_name() }}, {{ this.get_name() }}_marker, {{ this.get_name() }}_refresh);
+            {% endif %}
+            {{ this.get_name() }}_set({{ this.get_name() }}_data);
+            // Lets the auto-refresh script swap in a new snapshot without a page reload
+            window.updateVessels = {{ this.get_name() }}_set;
+        {% endmacro %}
+    """)
+    
+    default_js = []
+    
+    def __init__(self, records: Optional[List[Dict]] = None, radius: int = VESSEL_MARKER_RADIUS,
+                 pane: str = VESSEL_PANE, cluster: bool = ENABLE_VESSEL_CLUSTERING,
+                 cluster_radius: int = CLUSTER_RADIUS, cluster_max_zoom: int = CLUSTER_MAX_ZOOM):
+        """
+        Initialize vessel layer.
+        
+        Args:
+            records: Marker records (position, color, tooltip and popup fields), or None
+                to leave VESSEL_DATA_MARKER in place of the data
+            radius: Circle marker radius in pixels
+            pane: Map pane the shared vessel canvas is drawn in
+            cluster: Cluster markers in the browser with supercluster
+            cluster_radius: Cluster radius in pixels
+            cluster_max_zoom: Zoom level above which vessels are no longer clustered
+        """
+        super().__init__()
+        self._name = 'VesselLayer'
+        self.radius = radius
+        self.pane = pane
+        self.pane_z_index = VESSEL_PANE_Z_INDEX
+        self.cluster = cluster
+        self.cluster_radius = cluster_radius
+        self.cluster_max_zoom = cluster_max_zoom
+        if cluster:
+            self.default_js = [('supercluster', SUPERCLUSTER_JS)]
+        self.data = self.encode(records) if records is not None else VESSEL_DATA_MARKER
+    
+    @staticmethod
+    def encode(records: List[Dict]) -> str:
+        """Serialize marker records for embedding in the layer's script."""
+        return VesselLayer.join([VesselLayer.encode_record(record) for record in records])
+    
+    @staticmethod
+    def encode_record(record: Dict) -> str:
+        """Serialize a single marker record."""
+        # Escape "</" so popup markup can never close the surrounding <script>
+        return json.dumps(record, ensure_ascii=False).replace('</', '<\\/')
+    
+    @staticmethod
+    def join(encoded_records: List[str]) -> str:
+        """Combine individually encoded records into the layer's data array."""
+        return '[' + ','.join(encoded_records) + ']'
+
 
 class MapGenerator:
     """
@@ -44,6 +386,16 @@ class MapGenerator:
         """
         self.region_name = region_name
         self.output_file = output_file
+        # Vessel snapshot the page polls to refresh markers without reloading
+        self.data_file = f"{os.path.splitext(output_file)[0]}_vessels.json"
+        # Static assets are linked from STATIC_DIR rather than copied, by a
+        # path relative to the page so it works from the web server and file://
+        output_dir = os.path.dirname(os.path.abspath(output_file))
+        try:
+            self.static_url = os.path.relpath(STATIC_DIR, output_dir).replace(os.sep, '/')
+        except ValueError:
+            # Windows: output on another drive
+            self.static_url = Path(STATIC_DIR).as_uri()
         self.region_bounds = REGIONS.get(region_name, [[[-90, -180], [90, 180]]])
         self.ports = PORTS.get(region_name, [])
         
@@ -55,6 +407,31 @@ class MapGenerator:
             self.display_service = None
             self.region_manager = None
         
+        # Rendered page around the dynamic parts, built on first generate_map()
+        self._base_parts: Optional[Tuple[str, str, str]] = None
+        self._region_selector_html: Optional[str] = None
+        
+        # Encoded marker record per MMSI, reused while the vessel is unchanged
+        self._record_cache: Dict[int, Tuple[tuple, str]] = {}
+        
+        # Digest of the records last written to data_file
+        self._data_digest: Optional[str] = None
+        
+        # The page refreshes itself, so the browser is only opened once
+        self._map_opened = False
+        
+        # (region, st_mtime_ns) of the last page this generator wrote, so a
+        # caller can tell whether output_file still holds it
+        self.last_written: Optional[Tuple[str, int]] = None
+        
+        # Regenerations are serialized, and calls arriving within
+        # MAP_MIN_REGENERATE_SECONDS of the last one are coalesced into a
+        # single trailing run with the latest arguments
+        self._generate_lock = threading.Lock()
+        self._last_generated = float('-inf')
+        self._pending: Optional[Tuple[Dict[int, Vessel], Optional[int], Optional[int]]] = None
+        self._pending_timer: Optional[threading.Timer] = None
+        
     def create_base_map(self) -> folium.Map:
         """
         Create a base Folium map centered on the region.
@@ -74,234 +451,417 @@ class MapGenerator:
         m = folium.Map(
             location=[center_lat, center_lon],
             zoom_start=zoom,
-            tiles=MAP_TILES,
-            prefer_canvas=True
+            tiles=MAP_TILES
         )
         
+        # Only Leaflet itself is used; folium's default jQuery, Bootstrap and
+        # awesome-markers assets would just block rendering
+        m.default_js = [(name, url) for name, url in m.default_js if name == 'leaflet']
+        m.default_css = [(name, url) for name, url in m.default_css if name == 'leaflet_css']
+        
         return m
     
     def add_ports(self, m: folium.Map):
         """
         Add port markers to the map.
         
+        All ports go into a single GeoJSON layer, so they are added to the
+        map with one addData() call instead of one Folium marker each.
+        
         Args:
             m: Folium Map object
         """
-        for port in self.ports:
-            folium.CircleMarker(
-                [port["lat"], port["lon"]],
+        if not self.ports:
+            return
+        
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [port["lon"], port["lat"]]},
+                "properties": {
+                    "name": port["name"],
+                    "title": f"⚓ {port['name']}",
+                    "country": port["country"]
+                }
+            }
+            for port in self.ports
+        ]
+        
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": features},
+            name="Ports",
+            marker=folium.CircleMarker(
                 radius=PORT_MARKER_RADIUS,
-                popup=f"<b>⚓ {port['name']}</b><br>{port['country']}",
-                tooltip=port['name'],
                 color='blue',
                 fill=True,
                 fillColor='lightblue',
                 fillOpacity=0.7
-            ).add_to(m)
+            ),
+            tooltip=folium.GeoJsonTooltip(fields=["name"], labels=False),
+            popup=folium.GeoJsonPopup(fields=["title", "country"], labels=False)
+        ).add_to(m)
     
-    def add_vessels(self, m: folium.Map, vessels: Dict[int, Vessel]):
+    def _build_vessel_record(self, vessel: Vessel) -> Dict:
         """
-        Add vessel markers to the map.
+        Build the basic marker record for a single vessel.
         
         Args:
-            m: Folium Map object
-            vessels: Dictionary of vessels keyed by MMSI
+            vessel: Vessel object
+            
+        Returns:
+            Dictionary with position, color and AIS fields
         """
-        for mmsi, vessel in vessels.items():
-            if vessel.has_position():
-                self._add_vessel_marker(m, vessel)
+        # Different color for tankers vs other vessels
+        color, ship_type_name, is_tanker = _ship_type_style(vessel.ship_type)
+        
+        record = {
+            'lat': round(vessel.lat, COORD_DECIMALS),
+            'lon': round(vessel.lon, COORD_DECIMALS),
+            'color': color,
+            'mmsi': vessel.mmsi,
+            'name': vessel.name,
+            'type_name': ship_type_name,
+            'tanker': is_tanker,
+            'imo': vessel.imo,
+            'callsign': vessel.callsign,
+            'speed': vessel.speed,
+            'course': vessel.course,
+            'heading': vessel.heading,
+            'status': (['#333', vessel.get_navigational_status_text()]
+                       if vessel.navigational_status is not None else None),
+            'destination': vessel.destination,
+            'eta': vessel.eta,
+            'length': vessel.length,
+            'width': vessel.width,
+            'draught': vessel.draught,
+            'updates': vessel.update_count,
+            'last_seen': vessel.last_update,
+            'first_seen': vessel.first_seen,
+        }
+        return {key: value for key, value in record.items() if value is not None}
     
-    def _add_vessel_marker(self, m: folium.Map, vessel: Vessel):
+    def _build_vessel_records(self, vessels: List[Vessel]) -> List[Dict]:
         """
-        Add a single vessel marker to the map with comprehensive information.
+        Build the marker records for a batch of vessels.
         
         Args:
-            m: Folium Map object
-            vessel: Vessel object
+            vessels: Vessel objects
+            
+        Returns:
+            Records with position, color, tooltip text and popup fields
         """
+        records = [self._build_vessel_record(vessel) for vessel in vessels]
+        
         # Use enhanced display service if available
         if self.display_service and self.region_manager:
-            # Get nearby ports
-            nearby_ports = self.region_manager.get_nearby_ports(
-                vessel.lat, vessel.lon, max_distance_km=50
-            )
-            
-            # Generate enhanced popup
-            popup_html = self.display_service.generate_enhanced_popup(
-                vessel, nearby_ports
-            )
-            
-            # Generate enhanced tooltip
-            tooltip_text = self.display_service.generate_vessel_tooltip(vessel)
-            
-            # Get vessel icon
-            icon = self.display_service.get_vessel_icon(vessel)
-            
+            nearby_ports_map = {
+                vessel.mmsi: self.region_manager.get_nearby_ports(
+                    vessel.lat, vessel.lon, max_distance_km=50
+                )
+                for vessel in vessels
+            }
+            details = self.display_service.generate_batch(vessels, nearby_ports_map)
+            for record, fields in zip(records, details):
+                record.update(fields)
         else:
             # Fallback to basic display
-            ship_type_name = SHIP_TYPE_NAMES.get(vessel.ship_type, f"Type {vessel.ship_type}")
-            
-            # Build comprehensive popup with all available data
-            popup_html = f"""
-        <div style="font-family: Arial; min-width: 220px;">
-            <h4 style="margin: 0 0 8px 0; color: #d32f2f;">
-                🛢️ {vessel.name or f'MMSI {vessel.mmsi}'}
-            </h4>
-            <table style="font-size: 11px; width: 100%;">
-                <tr><td><b>Type:</b></td><td>{ship_type_name}</td></tr>
-                <tr><td><b>MMSI:</b></td><td>{vessel.mmsi}</td></tr>
-        """
-        
-            # Add IMO if available
-            if vessel.imo:
-                popup_html += f"<tr><td><b>IMO:</b></td><td>{vessel.imo}</td></tr>"
-        
-            # Add callsign if available
-            if vessel.callsign:
-                popup_html += f"<tr><td><b>Callsign:</b></td><td>{vessel.callsign}</td></tr>"
+            for record, vessel in zip(records, vessels):
+                record['tooltip'] = self._build_basic_tooltip(vessel)
         
-            # Navigation info
-            popup_html += f"""
-                <tr><td colspan="2" style="padding-top: 8px; border-top: 1px solid #ddd;"><b>Navigation</b></td></tr>
-                <tr><td><b>Speed:</b></td><td>{vessel.speed or 'N/A'} knots</td></tr>
-                <tr><td><b>Course:</b></td><td>{vessel.course or 'N/A'}°</td></tr>
+        return records
+    
+    def _encode_vessel_records(self, vessels: List[Vessel]) -> List[str]:
         """
+        Encode the marker record of each vessel, reusing unchanged ones.
         
-            if vessel.heading is not None:
-                popup_html += f"<tr><td><b>Heading:</b></td><td>{vessel.heading}°</td></tr>"
-        
-            if vessel.navigational_status is not None:
-                popup_html += f"<tr><td><b>Status:</b></td><td>{vessel.get_navigational_status_text()}</td></tr>"
+        Most vessels are unchanged between refreshes, so their records are
+        cached by MMSI and only rebuilt when _record_key() changes. Vessels
+        no longer on the map drop out of the cache.
         
-            # Voyage info
-            popup_html += f"""
-                <tr><td colspan="2" style="padding-top: 8px; border-top: 1px solid #ddd;"><b>Voyage</b></td></tr>
-                <tr><td><b>To:</b></td><td>{vessel.destination or 'Unknown'}</td></tr>
+        Args:
+            vessels: Vessels with a known position
+            
+        Returns:
+            Encoded records in the same order
         """
-        
-            if vessel.eta:
-                popup_html += f"<tr><td><b>ETA:</b></td><td>{vessel.eta}</td></tr>"
-        
-            # Vessel dimensions
-            if vessel.length or vessel.width:
-                popup_html += f"""
-                <tr><td colspan="2" style="padding-top: 8px; border-top: 1px solid #ddd;"><b>Dimensions</b></td></tr>
-                <tr><td><b>Size:</b></td><td>{vessel.get_dimensions()}</td></tr>
-            """
-        
-            if vessel.draught:
-                popup_html += f"<tr><td><b>Draught:</b></td><td>{vessel.draught} m</td></tr>"
-        
-            # Position and tracking
-            popup_html += f"""
-                <tr><td colspan="2" style="padding-top: 8px; border-top: 1px solid #ddd;"><b>Position</b></td></tr>
-                <tr><td><b>Lat, Lon:</b></td><td>{vessel.lat:.4f}, {vessel.lon:.4f}</td></tr>
-                <tr><td><b>Updates:</b></td><td>{vessel.update_count}</td></tr>
-                <tr><td><b>Last seen:</b></td><td>{vessel.last_update or 'N/A'}</td></tr>
+        cache = {}
+        stale = []
+        for vessel in vessels:
+            key = self._record_key(vessel)
+            cached = self._record_cache.get(vessel.mmsi)
+            if cached is None or cached[0] != key:
+                stale.append((vessel, key))
+            else:
+                cache[vessel.mmsi] = cached
+        
+        # Rebuild changed vessels in one batch
+        records = self._build_vessel_records([vessel for vessel, _ in stale])
+        for (vessel, key), record in zip(stale, records):
+            cache[vessel.mmsi] = (key, VesselLayer.encode_record(record))
+        
+        self._record_cache = cache
+        return [cache[vessel.mmsi][1] for vessel in vessels]
+    
+    @staticmethod
+    def _record_key(vessel: Vessel) -> tuple:
         """
+        Values a vessel's marker record depends on.
         
-            popup_html += """
-            </table>
-        </div>
+        update_count changes with every position report; static data
+        (name, voyage, dimensions) arrives separately and is listed as well.
         """
-            
-            # Create tooltip with key info
-            tooltip_text = f"{vessel.name or vessel.mmsi}"
-            if vessel.speed:
-                tooltip_text += f" | {vessel.speed} kts"
-            if vessel.destination:
-                tooltip_text += f" → {vessel.destination}"
-        
-        # Different color for tankers vs other vessels
-        color = 'darkred' if vessel.is_tanker(TANKER_TYPES) else 'orange'
-        
-        folium.CircleMarker(
-            [vessel.lat, vessel.lon],
-            radius=VESSEL_MARKER_RADIUS,
-            popup=folium.Popup(popup_html, max_width=350),  # Wider for enhanced display
-            tooltip=tooltip_text,
-            color=color,
-            fill=True,
-            fillColor=color,
-            fillOpacity=0.9
-        ).add_to(m)
+        return (vessel.update_count, vessel.name, vessel.ship_type, vessel.imo,
+                vessel.callsign, vessel.destination, vessel.eta, vessel.length,
+                vessel.width, vessel.draught, vessel.deadweight, vessel.gross_tonnage)
+    
+    def _build_basic_tooltip(self, vessel: Vessel) -> str:
+        """Build the basic tooltip HTML (name, speed and destination), escaping AIS text."""
+        speed = f" | {vessel.speed} kts" if vessel.speed else ""
+        destination = f" → {escape(vessel.destination)}" if vessel.destination else ""
+        return f"{escape(vessel.name) if vessel.name else vessel.mmsi}{speed}{destination}"
     
-    def generate_map(self, vessels: Dict[int, Vessel], auto_open: bool = False):
+    def generate_map(self, vessels: Dict[int, Vessel], auto_open: bool = False,
+                     active_count: Optional[int] = None, tanker_count: Optional[int] = None,
+                     force: bool = False):
         """
         Generate complete map with ports and vessels.
         
+        Calls made within MAP_MIN_REGENERATE_SECONDS of the previous map are
+        deferred: the latest one is written by a background timer once the
+        interval has passed, and earlier deferred calls are dropped.
+        
         Args:
             vessels: Dictionary of vessels keyed by MMSI
             auto_open: Whether to automatically open the map in browser
+            active_count: Number of positioned vessels, if the caller already
+                tracks it. Every vessel passed must then have a position.
+            tanker_count: Number of tankers among them (with active_count)
+            force: Write the map now even if one was just written
         """
-        active_count = sum(1 for v in vessels.values() if v.has_position())
-        tanker_count = sum(1 for v in vessels.values() if v.has_position() and v.is_tanker(TANKER_TYPES))
+        with self._generate_lock:
+            wait = self._last_generated + MAP_MIN_REGENERATE_SECONDS - time.monotonic()
+            if wait > 0 and not force:
+                self._pending = (vessels, active_count, tanker_count)
+                if self._pending_timer is None:
+                    self._pending_timer = threading.Timer(wait, self._generate_pending)
+                    self._pending_timer.daemon = True
+                    self._pending_timer.start()
+                logger.debug("Map regenerated %.1fs ago, deferring update", MAP_MIN_REGENERATE_SECONDS - wait)
+            else:
+                # This call supersedes any deferred one
+                self._pending = None
+                self._write_map(vessels, active_count, tanker_count)
         
-        logger.info(f"\n🗺️  Generating map with {active_count} vessels ({tanker_count} tankers)...")
+        if auto_open:
+            self.open_map()
+    
+    def _generate_pending(self):
+        """Write the latest deferred map, run by the timer set in generate_map()."""
+        with self._generate_lock:
+            self._pending_timer = None
+            pending, self._pending = self._pending, None
+            if pending is None:
+                return
+            try:
+                self._write_map(*pending)
+            except Exception as e:
+                logger.error("Deferred map update failed: %s", e)
+    
+    def cancel_pending(self):
+        """
+        Drop any deferred map update and stop its timer.
         
-        m = self.create_base_map()
-        self.add_ports(m)
-        self.add_vessels(m, vessels)
+        Called when the tracker stops, so a trailing update cannot overwrite
+        the output file after another tracker has taken it over.
+        """
+        with self._generate_lock:
+            self._pending = None
+            if self._pending_timer is not None:
+                self._pending_timer.cancel()
+                self._pending_timer = None
+    
+    def _write_map(self, vessels: Dict[int, Vessel], active_count: Optional[int],
+                   tanker_count: Optional[int]):
+        """
+        Write the map page and vessel snapshot (call with _generate_lock held).
         
-        # Add auto-refresh functionality and statistics to map
+        Args:
+            vessels: Dictionary of vessels keyed by MMSI
+            active_count: Number of positioned vessels, or None to count them
+            tanker_count: Number of tankers among them, or None to count them
+        """
+        self._last_generated = time.monotonic()
+        if active_count is not None and tanker_count is not None:
+            active = list(vessels.values())
+        else:
+            # Single pass: collect positioned vessels and count tankers
+            active = []
+            tanker_count = 0
+            for vessel in vessels.values():
+                if not vessel.has_position():
+                    continue
+                active.append(vessel)
+                if vessel.is_tanker(TANKER_TYPES):
+                    tanker_count += 1
+            active_count = len(active)
+        
+        logger.info("\n🗺️  Generating map with %d vessels (%d tankers)...", active_count, tanker_count)
+        
+        # Only the vessel data and the interface change between refreshes
+        encoded_records = self._encode_vessel_records(active)
         title_html = self._create_map_interface(active_count, tanker_count)
-        m.get_root().html.add_child(folium.Element(title_html))
         
-        # Atomic file write to prevent blank page during refresh
+        # Leave the snapshot untouched when no vessel changed, so the web
+        # server's ETag stays the same and polling pages get a 304
+        data_digest = self._digest_records(encoded_records)
+        write_data = data_digest != self._data_digest or not os.path.exists(self.data_file)
+        
+        # Atomic file writes to prevent blank page during refresh
         temp_file = f"{self.output_file}.tmp"
+        temp_data_file = f"{self.data_file}.tmp"
         try:
-            m.save(temp_file)
+            self._write_page(temp_file, title_html, encoded_records)
+            if write_data:
+                self._write_vessel_data(temp_data_file, encoded_records, active_count, tanker_count)
             
-            # Atomic rename to final file (prevents reading partial file)
-            # Retry logic for Windows file locking issues
-            import os
-            import time
-            max_retries = 5
-            retry_delay = 0.2  # Start with 200ms
+            # Atomic replace of the final files (prevents reading partial files)
+            if write_data:
+                self._replace_file(temp_data_file, self.data_file)
+                self._data_digest = data_digest
+            self._replace_file(temp_file, self.output_file)
+            self.last_written = (self.region_name, os.stat(self.output_file).st_mtime_ns)
             
-            for attempt in range(max_retries):
-                try:
-                    if os.path.exists(self.output_file):
-                        os.remove(self.output_file)
-                    os.rename(temp_file, self.output_file)
-                    break  # Success!
-                except (PermissionError, OSError) as e:
-                    if attempt < max_retries - 1:
-                        # File is locked, wait and retry
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff
-                    else:
-                        # Last attempt failed, raise the error
-                        raise
+            if GZIP_MAP_OUTPUT:
+                if write_data:
+                    self._write_gzip_copy(self.data_file)
+                self._write_gzip_copy(self.output_file)
             
-            logger.info(f"✅ Map saved to {self.output_file}\n")
+            logger.info("✅ Map saved to %s\n", self.output_file)
         except Exception as e:
-            logger.error(f"Failed to save map: {e}")
-            # Clean up temp file if it exists
-            if os.path.exists(temp_file):
+            logger.error("Failed to save map: %s", e)
+            # Clean up temp files left behind (best effort)
+            for path in (temp_file, temp_data_file):
                 try:
-                    os.remove(temp_file)
-                except:
-                    pass  # Best effort cleanup
+                    os.remove(path)
+                except OSError:
+                    pass
             raise
+    
+    def _build_base_once(self) -> Tuple[str, str, str]:
+        """
+        Render the static part of the page (tiles, ports, scripts) once.
         
-        if auto_open:
-            self.open_map()
+        The map is rendered with placeholders for the interface HTML and the
+        vessel data, which are the only parts that change between refreshes.
+        
+        Returns:
+            The page split around INTERFACE_MARKER and VESSEL_DATA_MARKER
+        """
+        m = self.create_base_map()
+        self.add_ports(m)
+        VesselLayer().add_to(m)
+        m.get_root().header.add_child(
+            folium.Element(f'<link rel="stylesheet" href="{self.static_url}/{INTERFACE_STYLESHEET}"/>'))
+        m.get_root().html.add_child(folium.Element(INTERFACE_MARKER))
+        
+        html = m.get_root().render()
+        head, rest = html.split(INTERFACE_MARKER)
+        middle, tail = rest.split(VESSEL_DATA_MARKER)
+        return head, middle, tail
     
-    def _create_map_interface(self, active_count: int, tanker_count: int) -> str:
+    def _write_page(self, path: str, interface_html: str, encoded_records: List[str]):
         """
-        Create the map interface HTML with auto-refresh functionality.
+        Write the cached base page with this refresh's interface and vessels.
+        
+        Args:
+            path: Destination file path
+            interface_html: Map interface HTML
+            encoded_records: Encoded vessel layer records
+        """
+        if self._base_parts is None:
+            self._base_parts = self._build_base_once()
+        head, middle, tail = self._base_parts
+        
+        with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(head)
+            f.write(interface_html)
+            f.write(middle)
+            self._write_records(f, encoded_records)
+            f.write(tail)
+    
+    def _write_vessel_data(self, path: str, encoded_records: List[str],
+                           active_count: int, tanker_count: int):
+        """
+        Write the vessel snapshot polled by the page's auto-refresh.
         
         Args:
+            path: Destination file path
+            encoded_records: Encoded vessel layer records
             active_count: Number of active vessels
             tanker_count: Number of active tankers
-            
-        Returns:
-            HTML string for the map interface
         """
-        refresh_status = "enabled" if ENABLE_AUTO_REFRESH else "disabled"
-        refresh_interval = HTML_AUTO_REFRESH_SECONDS if ENABLE_AUTO_REFRESH else 0
+        header = '{"region": %s, "active_count": %d, "tanker_count": %d, "updated": "%s", "records": ' % (
+            json.dumps(self.region_name), active_count, tanker_count, datetime.now().strftime("%H:%M:%S")
+        )
+        with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(header)
+            self._write_records(f, encoded_records)
+            f.write('}')
+    
+    @staticmethod
+    def _digest_records(encoded_records: List[str]) -> str:
+        """Return a short digest identifying this set of encoded records."""
+        digest = hashlib.blake2b(digest_size=8)
+        for record in encoded_records:
+            digest.update(record.encode('utf-8'))
+            digest.update(b'\n')
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _write_records(f, encoded_records: List[str]):
+        """Stream encoded records to f as a JSON array, without joining them first."""
+        f.write('[')
+        separator = ''
+        for record in encoded_records:
+            f.write(separator)
+            f.write(record)
+            separator = ','
+        f.write(']')
+    
+    def _write_gzip_copy(self, path: str):
+        """
+        Write a precompressed path + '.gz' for the web server to send as-is.
         
+        The copy is written after the original, so the server can tell a
+        stale copy (left by a failed write) by its older modification time.
+        """
+        gz_path = f"{path}.gz"
+        temp_path = f"{gz_path}.tmp"
+        try:
+            with open(path, 'rb') as src, gzip.open(temp_path, 'wb', compresslevel=GZIP_LEVEL) as dst:
+                shutil.copyfileobj(src, dst, WRITE_BUFFER_SIZE)
+            self._replace_file(temp_path, gz_path)
+        except OSError as e:
+            # The uncompressed file is still served, so this is not fatal
+            logger.warning("Could not write %s: %s", gz_path, e)
+    
+    @staticmethod
+    def _replace_file(temp_path: str, path: str):
+        """Atomically move a fully written temp file over its destination."""
+        try:
+            os.replace(temp_path, path)
+        except PermissionError:
+            # Windows: the browser or antivirus may briefly hold the file
+            time.sleep(0.1)
+            os.replace(temp_path, path)
+    
+    def _build_region_selector(self) -> str:
+        """
+        Build the region selector dropdown with the current region selected.
+        
+        Returns:
+            HTML string for the region selector
+        """
         # Create region selector dropdown with organized categories
         region_options = []
         
@@ -363,333 +923,88 @@ class MapGenerator:
             region_options.append('</optgroup>')
         
         region_selector_html = f'''
-        <div style="margin: 10px 0;">
-            <label style="font-size: 11px; font-weight: bold; display: block; margin-bottom: 3px;">📍 Strategic Region:</label>
-            <select id="region-selector" onchange="changeRegion()" 
-                    style="width: 100%; padding: 5px; font-size: 11px; border: 1px solid #ddd; border-radius: 3px; cursor: pointer;">
+        <div class="region-picker">
+            <label for="region-selector">📍 Strategic Region:</label>
+            <select id="region-selector" onchange="changeRegion()">
                 {''.join(region_options)}
             </select>
         </div>
         '''
         
+        return region_selector_html
+    
+    def _create_map_interface(self, active_count: int, tanker_count: int) -> str:
+        """
+        Create the map interface HTML with auto-refresh functionality.
+        
+        Args:
+            active_count: Number of active vessels
+            tanker_count: Number of active tankers
+            
+        Returns:
+            HTML string for the map interface
+        """
+        refresh_status = "enabled" if ENABLE_AUTO_REFRESH else "disabled"
+        refresh_interval = HTML_AUTO_REFRESH_SECONDS if ENABLE_AUTO_REFRESH else 0
+        
+        # The selector only depends on the region, so it is built once
+        if self._region_selector_html is None:
+            self._region_selector_html = self._build_region_selector()
+        region_selector_html = self._region_selector_html
+        
         # Create controls for auto-refresh
         controls_html = ""
         if ENABLE_AUTO_REFRESH:
             controls_html = f'''
-            <div style="margin-top: 10px; padding-top: 8px; border-top: 1px solid #ddd;">
-                <p id="refresh-timer" style="margin: 5px 0; font-size: 10px; color: #2196F3;">
+            <div class="refresh-controls">
+                <p id="refresh-timer">
                     Auto-refresh in: <span id="countdown">{refresh_interval}</span>s
                 </p>
-                <div id="status-indicator" style="font-size: 9px; color: #4caf50; margin: 3px 0;">● Ready</div>
-                <button id="pause-btn" onclick="toggleAutoRefresh()" 
-                        style="background: #ff9800; color: white; border: none; padding: 2px 6px; 
-                               border-radius: 3px; font-size: 10px; cursor: pointer;">
-                    Pause
-                </button>
-                <button id="refresh-btn" onclick="manualRefresh()" 
-                        style="background: #4caf50; color: white; border: none; padding: 2px 6px; 
-                               border-radius: 3px; font-size: 10px; cursor: pointer; margin-left: 5px;">
-                    Refresh Now
-                </button>
+                <div id="status-indicator">● Ready</div>
+                <button id="pause-btn" onclick="toggleAutoRefresh()">Pause</button>
+                <button id="refresh-btn" onclick="manualRefresh()">Refresh Now</button>
             </div>
             '''
         
         title_html = f'''
-        <div style="position: fixed; 
-                    top: 10px; 
-                    left: 50px; 
-                    width: 320px; 
-                    background-color: white; 
-                    border: 2px solid grey; 
-                    z-index: 9999; 
-                    padding: 10px;
-                    border-radius: 5px;
-                    box-shadow: 0 0 10px rgba(0,0,0,0.3);">
-            <h4 style="margin: 0 0 10px 0;">🛢️ Strategic Tanker Tracker</h4>
+        <div id="map-panel">
+            <h4>🛢️ Strategic Tanker Tracker</h4>
             {region_selector_html}
-            <p style="margin: 5px 0; font-size: 12px;"><b>Active Vessels:</b> {active_count}</p>
-            <p style="margin: 5px 0; font-size: 12px;"><b>🛢️ Tankers:</b> <span style="color: darkred; font-weight: bold;">{tanker_count}</span></p>
-            <p style="margin: 5px 0; font-size: 10px; color: gray;">Last updated: {datetime.now().strftime("%H:%M:%S")}</p>
-            <p style="margin: 5px 0; font-size: 10px; color: gray;">Auto-refresh: {refresh_status}</p>
+            <p class="stat"><b>Active Vessels:</b> <span id="active-count">{active_count}</span></p>
+            <p class="stat"><b>🛢️ Tankers:</b> <span id="tanker-count">{tanker_count}</span></p>
+            <p class="note">Last updated: <span id="last-updated">{datetime.now().strftime("%H:%M:%S")}</span></p>
+            <p class="note">Auto-refresh: {refresh_status}</p>
             {controls_html}
         </div>
         '''
         
-        # Add JavaScript for auto-refresh functionality
-        if ENABLE_AUTO_REFRESH:
-            script_html = f'''
-            <script>
-                // Auto-refresh configuration
-                let refreshInterval = {refresh_interval};
-                let countdown = refreshInterval;
-                let isPaused = false;
-                let userActive = false;
-                let activityTimeout;
-                let countdownTimer;
-                let isRefreshing = false;
-                
-                // Region change function
-                async function changeRegion() {{
-                    const selector = document.getElementById('region-selector');
-                    const newRegion = selector.value;
-                    
-                    console.log('Changing region to:', newRegion);
-                    updateStatus('Switching region...', '#ff9800');
-                    
-                    // Pause auto-refresh during region change
-                    isPaused = true;
-                    
-                    try {{
-                        // Call backend API to change region
-                        const response = await fetch('/api/change-region', {{
-                            method: 'POST',
-                            headers: {{
-                                'Content-Type': 'application/json',
-                            }},
-                            body: JSON.stringify({{ region: newRegion }})
-                        }});
-                        
-                        if (response.ok) {{
-                            updateStatus('Region changed! Reloading...', '#4caf50');
-                            // Wait for the tracker to restart and file to be ready
-                            setTimeout(() => {{
-                                window.location.reload(true);
-                            }}, 4000);  // Increased to 4 seconds to ensure tracker has restarted
-                        }} else {{
-                            updateStatus('Region change failed', '#f44336');
-                            console.error('Region change failed:', response);
-                        }}
-                    }} catch (error) {{
-                        console.error('Error changing region:', error);
-                        updateStatus('Error - server not running?', '#f44336');
-                        alert('Could not change region. Make sure the web server is running.\\nUse: python launcher.py');
-                    }}
-                }}
-                
-                // Update status indicator
-                function updateStatus(message, color = '#4caf50') {{
-                    const statusElement = document.getElementById('status-indicator');
-                    if (statusElement) {{
-                        statusElement.textContent = '● ' + message;
-                        statusElement.style.color = color;
-                    }}
-                }}
-                
-                // Safe reload function with error handling
-                function safeReload() {{
-                    if (isRefreshing) {{
-                        console.log('Refresh already in progress, skipping...');
-                        updateStatus('Refresh in progress...', '#ff9800');
-                        return;
-                    }}
-                    
-                    isRefreshing = true;
-                    console.log('Initiating safe page refresh...');
-                    
-                    // Update UI indicators
-                    const countdownElement = document.getElementById('countdown');
-                    const refreshBtn = document.getElementById('refresh-btn');
-                    
-                    if (countdownElement) {{
-                        countdownElement.textContent = 'Loading...';
-                    }}
-                    if (refreshBtn) {{
-                        refreshBtn.disabled = true;
-                        refreshBtn.textContent = 'Loading...';
-                        refreshBtn.style.background = '#ccc';
-                    }}
-                    
-                    updateStatus('Refreshing...', '#2196f3');
-                    
-                    // Create a delay to ensure map generation is complete
-                    setTimeout(() => {{
-                        try {{
-                            // Try cache-busting URL first
-                            const currentUrl = window.location.href.split('?')[0].split('#')[0];
-                            const refreshUrl = currentUrl + '?refresh=' + Date.now();
-                            
-                            // Test if we can fetch the file first (basic availability check)
-                            fetch(refreshUrl, {{ method: 'HEAD' }})
-                                .then(response => {{
-                                    if (response.ok) {{
-                                        window.location.href = refreshUrl;
-                                    }} else {{
-                                        throw new Error('File not available');
-                                    }}
-                                }})
-                                .catch(error => {{
-                                    console.warn('Fetch test failed, using standard reload:', error);
-                                    window.location.reload(true);
-                                }});
-                        }} catch (error) {{
-                            console.error('Refresh failed:', error);
-                            updateStatus('Refresh failed, retrying...', '#f44336');
-                            // Fallback to standard reload
-                            setTimeout(() => window.location.reload(true), 1000);
-                        }}
-                    }}, 750); // 750ms delay to allow file write completion
-                }}
-                
-                // Manual refresh with confirmation
-                function manualRefresh() {{
-                    console.log('Manual refresh requested');
-                    updateStatus('Manual refresh...', '#2196f3');
-                    safeReload();
-                }}
-                
-                // Update countdown display
-                function updateCountdown() {{
-                    if (!isPaused) {{
-                        const countdownElement = document.getElementById('countdown');
-                        if (countdownElement) {{
-                            countdownElement.textContent = countdown;
-                        }}
-                        
-                        if (countdown <= 0) {{
-                            // Check if user activity detection is enabled
-                            if ({str(PAUSE_ON_USER_ACTIVITY).lower()}) {{
-                                if (!userActive) {{
-                                    safeReload();
-                                }} else {{
-                                    console.log('Refresh paused: user is active');
-                                    countdown = refreshInterval; // Reset countdown
-                                }}
-                            }} else {{
-                                safeReload();
-                            }}
-                        }} else {{
-                            countdown--;
-                        }}
-                    }}
-                }}
-                
-                // Toggle auto-refresh pause
-                function toggleAutoRefresh() {{
-                    isPaused = !isPaused;
-                    const pauseBtn = document.getElementById('pause-btn');
-                    const timerElement = document.getElementById('refresh-timer');
-                    
-                    if (isPaused) {{
-                        pauseBtn.textContent = 'Resume';
-                        pauseBtn.style.background = '#4caf50';
-                        timerElement.style.color = '#ff9800';
-                        document.getElementById('countdown').textContent = 'PAUSED';
-                    }} else {{
-                        pauseBtn.textContent = 'Pause';
-                        pauseBtn.style.background = '#ff9800';
-                        timerElement.style.color = '#2196F3';
-                        countdown = refreshInterval; // Reset countdown
-                    }}
-                }}
-                
-                // Start countdown timer
-                countdownTimer = setInterval(updateCountdown, 1000);
-                
-                // User activity detection (if enabled)
-                if ({str(PAUSE_ON_USER_ACTIVITY).lower()}) {{
-                    function resetUserActivity() {{
-                        userActive = true;
-                        clearTimeout(activityTimeout);
-                        activityTimeout = setTimeout(() => {{
-                            userActive = false;
-                            console.log('User inactive, auto-refresh re-enabled');
-                        }}, {USER_ACTIVITY_TIMEOUT * 1000});
-                    }}
-                    
-                    document.addEventListener('mousemove', resetUserActivity);
-                    document.addEventListener('click', resetUserActivity);
-                    document.addEventListener('scroll', resetUserActivity);
-                    document.addEventListener('keypress', resetUserActivity);
-                }}
-                
-                // Keyboard shortcuts
-                document.addEventListener('keydown', function(e) {{
-                    if (e.key === 'F5' || (e.ctrlKey && e.key === 'r')) {{
-                        // Manual refresh - reset countdown
-                        countdown = refreshInterval;
-                    }}
-                    if (e.key === ' ' || e.key === 'Spacebar') {{
-                        // Spacebar to toggle pause
-                        e.preventDefault();
-                        toggleAutoRefresh();
-                    }}
-                }});
-                
-                // Page visibility API to pause when tab is not visible
-                document.addEventListener('visibilitychange', function() {{
-                    if (document.hidden) {{
-                        clearInterval(countdownTimer);
-                    }} else {{
-                        countdownTimer = setInterval(updateCountdown, 1000);
-                        countdown = refreshInterval; // Reset when tab becomes visible
-                    }}
-                }});
-                
-                // Error handling for failed loads
-                window.addEventListener('error', function(e) {{
-                    console.error('Page load error:', e);
-                    updateStatus('Error loading page', '#f44336');
-                    isRefreshing = false;
-                }});
-                
-                // Detect if page loaded successfully
-                window.addEventListener('load', function() {{
-                    console.log('Page loaded successfully');
-                    updateStatus('Ready', '#4caf50');
-                    isRefreshing = false;
-                }});
-                
-                // DOM content loaded handler
-                document.addEventListener('DOMContentLoaded', function() {{
-                    updateStatus('Page ready', '#4caf50');
-                    isRefreshing = false;
-                }});
-                
-                // Fallback error recovery with retry mechanism
-                let refreshAttempts = 0;
-                const maxRefreshAttempts = 3;
-                
-                function handleRefreshFailure() {{
-                    refreshAttempts++;
-                    console.warn(`Refresh attempt ${{refreshAttempts}} failed`);
-                    
-                    if (refreshAttempts < maxRefreshAttempts) {{
-                        updateStatus(`Retry ${{refreshAttempts}}/${{maxRefreshAttempts}}`, '#ff9800');
-                        setTimeout(() => {{
-                            console.log('Retrying with simple reload...');
-                            window.location.reload(true);
-                        }}, 2000 * refreshAttempts); // Progressive delay
-                    }} else {{
-                        updateStatus('Refresh failed - manual action needed', '#f44336');
-                        isRefreshing = false;
-                        
-                        // Re-enable controls
-                        const refreshBtn = document.getElementById('refresh-btn');
-                        if (refreshBtn) {{
-                            refreshBtn.disabled = false;
-                            refreshBtn.textContent = 'Try Again';
-                            refreshBtn.style.background = '#f44336';
-                        }}
-                    }}
-                }}
-                
-                // Timeout handler
-                setTimeout(() => {{
-                    if (isRefreshing) {{
-                        console.log('Refresh timeout, attempting recovery...');
-                        handleRefreshFailure();
-                    }}
-                }}, 15000); // 15 second timeout
-                
-                console.log('Auto-refresh enabled: {refresh_interval}s interval with safe reload');
-            </script>
-            '''
-            title_html += script_html
+        # Auto-refresh and region switching live in a static script copied
+        # next to the map; it is also needed for the region selector when
+        # auto-refresh is disabled, and then skips the countdown entirely
+        refresh_cfg = json.dumps({
+            'autoRefresh': ENABLE_AUTO_REFRESH,
+            'interval': refresh_interval,
+            'pauseOnActivity': PAUSE_ON_USER_ACTIVITY,
+            'activityTimeoutMs': USER_ACTIVITY_TIMEOUT * 1000,
+            'dataUrl': os.path.basename(self.data_file),
+            'region': self.region_name,
+            'debug': LOG_LEVEL.upper() == 'DEBUG',
+        })
+        script_html = f'''
+        <script>window.__cfg = {refresh_cfg};</script>
+        <script src="{self.static_url}/{REFRESH_UI_SCRIPT}" defer></script>
+        '''
+        title_html += script_html
         
         return title_html
 
     def open_map(self):
-        """Open the map in the default web browser."""
+        """Open the map in the default web browser, unless already opened."""
+        if self._map_opened:
+            logger.debug("Map already open in browser, not opening again")
+            return
+        self._map_opened = True
+        
         map_path = os.path.abspath(self.output_file)
         webbrowser.open(f'file://{map_path}')
         logger.info(f"🌐 Map opened in browser")
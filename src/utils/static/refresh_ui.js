@@ -0,0 +1,372 @@
+/*
+ * Auto-refresh and region controls for the generated tanker map.
+ *
+ * Copied next to the map HTML by MapGenerator. Settings come from
+ * window.__cfg, which the page defines before loading this script:
+ *   autoRefresh       - run the countdown; when false only the region
+ *                       selector is wired up
+ *   interval          - auto-refresh interval in seconds
+ *   pauseOnActivity   - skip refreshes while the user is interacting
+ *   activityTimeoutMs - inactivity period after which refreshes resume
+ *   dataUrl           - vessel snapshot JSON written alongside the map
+ *   region            - region this page was generated for
+ *   debug             - log refresh progress to the console
+ */
+
+// Auto-refresh configuration
+const cfg = window.__cfg || {};
+let refreshInterval = cfg.interval;
+let isPaused = false;
+// The countdown is derived from these timestamps on each tick, so it cannot
+// drift and activity events only need to record when they happened
+let countdownStart = performance.now();
+let lastActivity = -Infinity;
+let isRefreshing = false;
+// ETag of the last vessel snapshot applied, so unchanged data is answered
+// with a 304 instead of being downloaded and re-rendered
+let dataEtag = null;
+
+// Progress messages only matter when debugging the refresh cycle
+const debugLog = cfg.debug ? console.log.bind(console) : function() {};
+
+// Panel elements, looked up once instead of on every tick (the script is
+// deferred, so the panel has been parsed by the time it runs)
+const countdownElement = document.getElementById('countdown');
+const statusElement = document.getElementById('status-indicator');
+const refreshBtn = document.getElementById('refresh-btn');
+const pauseBtn = document.getElementById('pause-btn');
+const timerElement = document.getElementById('refresh-timer');
+
+// How often, and how many times, to ask whether the new region's map is ready
+const regionPollMs = 200;
+const maxRegionPolls = 30;
+
+// Wait until the server reports the tracker has written the map for region
+// (or give up after maxRegionPolls and let the reload show what is there)
+async function waitForRegionMap(region) {
+    for (let i = 0; i < maxRegionPolls; i++) {
+        await new Promise(resolve => setTimeout(resolve, regionPollMs));
+        const status = await fetch('/api/region-status', { cache: 'no-store' })
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+        if (status && status.region === region && status.ready) {
+            return;
+        }
+    }
+    debugLog('Region status polling timed out, reloading anyway');
+}
+
+// Region change function
+async function changeRegion() {
+    const selector = document.getElementById('region-selector');
+    const newRegion = selector.value;
+
+    debugLog('Changing region to:', newRegion);
+    updateStatus('Switching region...', '#ff9800');
+
+    // Pause auto-refresh during region change
+    isPaused = true;
+
+    try {
+        // Call backend API to change region
+        const response = await fetch('/api/change-region', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ region: newRegion })
+        });
+
+        if (response.ok) {
+            updateStatus('Region changed! Reloading...', '#4caf50');
+            // Wait for the restarted tracker to write the new map
+            await waitForRegionMap(newRegion);
+            window.location.reload(true);
+        } else {
+            updateStatus('Region change failed', '#f44336');
+            console.error('Region change failed:', response);
+        }
+    } catch (error) {
+        console.error('Error changing region:', error);
+        updateStatus('Error - server not running?', '#f44336');
+        alert('Could not change region. Make sure the web server is running.\nUse: python launcher.py');
+    }
+}
+
+// Update status indicator
+function updateStatus(message, color = '#4caf50') {
+    if (statusElement) {
+        statusElement.textContent = '● ' + message;
+        statusElement.style.color = color;
+    }
+}
+
+// Refresh vessel markers in place from the data file; fall back to a
+// full page reload when it cannot be fetched (e.g. opened from file://)
+function safeReload() {
+    if (isRefreshing) {
+        debugLog('Refresh already in progress, skipping...');
+        updateStatus('Refresh in progress...', '#ff9800');
+        return;
+    }
+
+    isRefreshing = true;
+    debugLog('Initiating safe page refresh...');
+
+    // Update UI indicators
+    if (countdownElement) {
+        countdownElement.textContent = 'Loading...';
+    }
+    if (refreshBtn) {
+        refreshBtn.disabled = true;
+        refreshBtn.textContent = 'Loading...';
+        refreshBtn.style.background = '#ccc';
+    }
+
+    updateStatus('Refreshing...', '#2196f3');
+
+    if (!cfg.dataUrl || !window.updateVessels) {
+        reloadPage();
+        return;
+    }
+
+    const headers = dataEtag ? { 'If-None-Match': dataEtag } : {};
+    fetch(cfg.dataUrl + '?_=' + Date.now(), { cache: 'no-store', headers: headers })
+        .then(response => {
+            if (response.status === 304) {
+                return null;
+            }
+            if (!response.ok) {
+                throw new Error('HTTP ' + response.status);
+            }
+            dataEtag = response.headers.get('ETag');
+            return response.json();
+        })
+        .then(snapshot => {
+            if (snapshot === null) {
+                debugLog('Vessel data unchanged');
+                refreshComplete();
+                return;
+            }
+            if (snapshot.region !== cfg.region) {
+                // The tracker switched region; the page itself must be rebuilt
+                debugLog('Region changed to ' + snapshot.region + ', reloading page');
+                reloadPage();
+                return;
+            }
+            window.updateVessels(snapshot.records);
+            setText('active-count', snapshot.active_count);
+            setText('tanker-count', snapshot.tanker_count);
+            setText('last-updated', snapshot.updated);
+            refreshComplete();
+        })
+        .catch(error => {
+            console.warn('Vessel data refresh failed, reloading page:', error);
+            reloadPage();
+        });
+}
+
+function setText(id, value) {
+    const element = document.getElementById(id);
+    if (element) {
+        element.textContent = value;
+    }
+}
+
+// Reset refresh state and controls after an in-place update
+function refreshComplete() {
+    isRefreshing = false;
+    refreshAttempts = 0;
+    resetCountdown();
+
+    if (refreshBtn) {
+        refreshBtn.disabled = false;
+        refreshBtn.textContent = 'Refresh Now';
+        refreshBtn.style.background = '#4caf50';
+    }
+    setText('countdown', refreshInterval);
+    updateStatus('Updated', '#4caf50');
+}
+
+// Full page reload
+function reloadPage() {
+    // Create a delay to ensure map generation is complete
+    setTimeout(() => {
+        try {
+            // Try cache-busting URL first
+            const currentUrl = window.location.href.split('?')[0].split('#')[0];
+            const refreshUrl = currentUrl + '?refresh=' + Date.now();
+
+            // Test if we can fetch the file first (basic availability check)
+            fetch(refreshUrl, { method: 'HEAD' })
+                .then(response => {
+                    if (response.ok) {
+                        window.location.href = refreshUrl;
+                    } else {
+                        throw new Error('File not available');
+                    }
+                })
+                .catch(error => {
+                    console.warn('Fetch test failed, using standard reload:', error);
+                    window.location.reload(true);
+                });
+        } catch (error) {
+            console.error('Refresh failed:', error);
+            updateStatus('Refresh failed, retrying...', '#f44336');
+            // Fallback to standard reload
+            setTimeout(() => window.location.reload(true), 1000);
+        }
+    }, 750); // 750ms delay to allow file write completion
+}
+
+// Manual refresh with confirmation
+function manualRefresh() {
+    debugLog('Manual refresh requested');
+    updateStatus('Manual refresh...', '#2196f3');
+    safeReload();
+}
+
+// Restart the countdown from the full interval
+function resetCountdown() {
+    countdownStart = performance.now();
+}
+
+// Update countdown display
+function updateCountdown() {
+    // Hidden tabs skip the work; time spent hidden still counts down, so a
+    // refresh that fell due meanwhile runs as soon as the tab is shown
+    if (isPaused || document.hidden) {
+        return;
+    }
+
+    const now = performance.now();
+    const remaining = Math.max(0, refreshInterval - Math.floor((now - countdownStart) / 1000));
+    if (countdownElement) {
+        countdownElement.textContent = remaining;
+    }
+
+    if (remaining <= 0) {
+        // Check if user activity detection is enabled
+        if (cfg.pauseOnActivity && now - lastActivity < cfg.activityTimeoutMs) {
+            debugLog('Refresh paused: user is active');
+            resetCountdown();
+        } else {
+            safeReload();
+        }
+    }
+}
+
+// Toggle auto-refresh pause
+function toggleAutoRefresh() {
+    isPaused = !isPaused;
+    if (isPaused) {
+        pauseBtn.textContent = 'Resume';
+        pauseBtn.style.background = '#4caf50';
+        timerElement.style.color = '#ff9800';
+        countdownElement.textContent = 'PAUSED';
+    } else {
+        pauseBtn.textContent = 'Pause';
+        pauseBtn.style.background = '#ff9800';
+        timerElement.style.color = '#2196F3';
+        resetCountdown();
+    }
+}
+
+// Start the countdown and the listeners that only matter with auto-refresh
+function startAutoRefresh() {
+    setInterval(updateCountdown, 1000);
+
+    // User activity detection (if enabled); updateCountdown() checks the
+    // timestamp, so events fire no timers of their own
+    if (cfg.pauseOnActivity) {
+        const markUserActivity = () => { lastActivity = performance.now(); };
+
+        ['mousemove', 'click', 'scroll', 'keypress'].forEach(type => {
+            document.addEventListener(type, markUserActivity, { passive: true });
+        });
+    }
+
+    // Keyboard shortcuts, dispatched from a single listener
+    document.addEventListener('keydown', function(e) {
+        switch (e.key) {
+            case 'F5':
+            case 'r':
+                // Manual refresh - reset countdown
+                if (e.key === 'F5' || e.ctrlKey) {
+                    resetCountdown();
+                }
+                break;
+            case ' ':
+            case 'Spacebar':
+                // Spacebar to toggle pause, unless it is meant for a form control
+                if (e.target.closest && e.target.closest('input, select, textarea, button')) {
+                    break;
+                }
+                e.preventDefault();
+                toggleAutoRefresh();
+                break;
+        }
+    });
+
+    debugLog(`Auto-refresh enabled: ${refreshInterval}s interval with safe reload`);
+}
+
+if (cfg.autoRefresh) {
+    startAutoRefresh();
+}
+
+// Error handling for failed loads
+window.addEventListener('error', function(e) {
+    console.error('Page load error:', e);
+    updateStatus('Error loading page', '#f44336');
+    isRefreshing = false;
+});
+
+// Mark the page ready once. The script is deferred, so the document has
+// normally been parsed already and this runs straight away
+function bootstrap() {
+    debugLog('Page loaded successfully');
+    updateStatus('Ready', '#4caf50');
+    isRefreshing = false;
+}
+
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', bootstrap, { once: true });
+} else {
+    bootstrap();
+}
+
+// Fallback error recovery with retry mechanism
+let refreshAttempts = 0;
+const maxRefreshAttempts = 3;
+
+function handleRefreshFailure() {
+    refreshAttempts++;
+    console.warn(`Refresh attempt ${refreshAttempts} failed`);
+
+    if (refreshAttempts < maxRefreshAttempts) {
+        updateStatus(`Retry ${refreshAttempts}/${maxRefreshAttempts}`, '#ff9800');
+        setTimeout(() => {
+            debugLog('Retrying with simple reload...');
+            window.location.reload(true);
+        }, 2000 * refreshAttempts); // Progressive delay
+    } else {
+        updateStatus('Refresh failed - manual action needed', '#f44336');
+        isRefreshing = false;
+
+        // Re-enable controls
+        if (refreshBtn) {
+            refreshBtn.disabled = false;
+            refreshBtn.textContent = 'Try Again';
+            refreshBtn.style.background = '#f44336';
+        }
+    }
+}
+
+// Timeout handler
+setTimeout(() => {
+    if (isRefreshing) {
+        debugLog('Refresh timeout, attempting recovery...');
+        handleRefreshFailure();
+    }
+}, 15000); // 15 second timeout
@@ -11,14 +11,85 @@ Provides SQLite-based caching for vessel data to enable:
 import sqlite3
 import json
 import logging
-from typing import Optional, Dict, List
-from datetime import datetime
+from typing import Optional, Dict, Iterator, List
+from datetime import datetime, timedelta
 from pathlib import Path
 
 from models.vessel import Vessel
 
 logger = logging.getLogger(__name__)
 
+# Upsert of one vessel row, shared by save_vessel and bulk_save
+SAVE_VESSEL_SQL = '''
+    INSERT OR REPLACE INTO vessels (
+        mmsi, lat, lon, speed, course, heading, rot,
+        navigational_status, position_accuracy,
+        name, imo, callsign, ship_type,
+        length, width, draught,
+        dimension_to_bow, dimension_to_stern,
+        dimension_to_port, dimension_to_starboard,
+        destination, eta, cargo, deadweight, gross_tonnage,
+        last_update, first_seen, update_count,
+        updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+'''
+
+# Vessel columns in the order _row_to_vessel unpacks them
+VESSEL_COLUMNS = '''
+    mmsi, lat, lon, speed, course, heading, rot,
+    navigational_status, position_accuracy,
+    name, imo, callsign, ship_type,
+    length, width, draught,
+    dimension_to_bow, dimension_to_stern,
+    dimension_to_port, dimension_to_starboard,
+    destination, eta, cargo, deadweight, gross_tonnage,
+    last_update, first_seen, update_count
+'''
+
+# Queries run on hot paths, kept as constants so the text is built once and
+# sqlite3's per-connection statement cache reuses the compiled statements
+GET_VESSEL_SQL = f'SELECT {VESSEL_COLUMNS} FROM vessels WHERE mmsi = ?'
+ALL_VESSELS_SQL = f'SELECT {VESSEL_COLUMNS} FROM vessels ORDER BY last_update DESC'
+VESSELS_BY_TYPE_SQL = (f'SELECT {VESSEL_COLUMNS} FROM vessels '
+                       'WHERE ship_type IN ({placeholders}) ORDER BY last_update DESC')
+VESSELS_BY_REGION_SQL = f'SELECT {VESSEL_COLUMNS} FROM vessels WHERE current_region = ? ORDER BY last_update DESC'
+SAVE_HISTORY_SQL = '''
+    INSERT INTO vessel_history
+    (mmsi, lat, lon, speed, course, heading, timestamp, region)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+UPDATE_REGION_SQL = 'UPDATE vessels SET current_region = ?, last_region_update = ? WHERE mmsi = ?'
+
+
+def _sanitize_value(value):
+    """Convert complex data types to strings or None."""
+    if value is None:
+        return None
+    elif isinstance(value, (dict, list, tuple)):
+        return str(value)  # Convert to string representation
+    elif isinstance(value, (int, float)):
+        return value  # Keep numeric values as-is
+    elif isinstance(value, str):
+        return value
+    else:
+        return str(value)  # Convert other types to string
+
+
+def _vessel_params(vessel: Vessel) -> tuple:
+    """Build the SAVE_VESSEL_SQL parameters for a vessel."""
+    # Sanitize text fields to prevent dict/list objects (numeric values are kept as-is)
+    return (
+        vessel.mmsi, vessel.lat, vessel.lon, vessel.speed, vessel.course,
+        vessel.heading, vessel.rot, vessel.navigational_status, vessel.position_accuracy,
+        _sanitize_value(vessel.name), vessel.imo, _sanitize_value(vessel.callsign), vessel.ship_type,
+        vessel.length, vessel.width, vessel.draught,
+        vessel.dimension_to_bow, vessel.dimension_to_stern,
+        vessel.dimension_to_port, vessel.dimension_to_starboard,
+        _sanitize_value(vessel.destination), _sanitize_value(vessel.eta), _sanitize_value(vessel.cargo),
+        vessel.deadweight, vessel.gross_tonnage,
+        _sanitize_value(vessel.last_update), _sanitize_value(vessel.first_seen), vessel.update_count
+    )
+
 
 class VesselDatabase:
     """
@@ -43,8 +114,17 @@ class VesselDatabase:
     def _initialize_database(self):
         """Create database tables if they don't exist."""
         try:
+            # Rows are plain tuples; queries list their columns explicitly
             self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.conn.row_factory = sqlite3.Row
+            
+            # WAL lets readers run alongside the writer, and with NORMAL sync
+            # commits no longer fsync (only checkpoints do); a crash can lose
+            # the last few vessel updates, which AIS will resend anyway
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+            self.conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
             
             cursor = self.conn.cursor()
             
@@ -95,15 +175,16 @@ class VesselDatabase:
                 )
             ''')
             
-            # Create index on MMSI for fast lookups
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_mmsi ON vessels(mmsi)
-            ''')
+            # mmsi is the INTEGER PRIMARY KEY (the rowid), so lookups need no
+            # extra index; drop the redundant one older databases still have
+            cursor.execute('DROP INDEX IF EXISTS idx_mmsi')
             
-            # Create index on ship type for filtering
+            # Index ship type together with last update, so filtering by type
+            # can return rows already in ORDER BY last_update DESC order
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_ship_type ON vessels(ship_type)
+                CREATE INDEX IF NOT EXISTS idx_type_updated ON vessels(ship_type, last_update DESC)
             ''')
+            cursor.execute('DROP INDEX IF EXISTS idx_ship_type')
             
             # Create index on last update for sorting
             cursor.execute('''
@@ -158,6 +239,9 @@ class VesselDatabase:
             ''')
             
             self.conn.commit()
+            
+            # Refresh the planner statistics the type/date indexes rely on
+            cursor.execute('ANALYZE')
             logger.info(f"✅ Vessel database initialized at {self.db_path}")
             
         except Exception as e:
@@ -172,49 +256,7 @@ class VesselDatabase:
             vessel: Vessel object to save
         """
         try:
-            cursor = self.conn.cursor()
-            
-            # Sanitize data to prevent dict/list objects
-            def sanitize_value(value, preserve_numeric=False):
-                """Convert complex data types to strings or None."""
-                if value is None:
-                    return None
-                elif isinstance(value, (dict, list, tuple)):
-                    return str(value)  # Convert to string representation
-                elif isinstance(value, (int, float)):
-                    return value  # Keep numeric values as-is
-                elif isinstance(value, str):
-                    return value
-                else:
-                    return str(value)  # Convert other types to string
-            
-            # Prepare sanitized parameters (preserve numeric values for ship_type, etc.)
-            params = (
-                vessel.mmsi, vessel.lat, vessel.lon, vessel.speed, vessel.course,
-                vessel.heading, vessel.rot, vessel.navigational_status, vessel.position_accuracy,
-                sanitize_value(vessel.name), vessel.imo, sanitize_value(vessel.callsign), vessel.ship_type,
-                vessel.length, vessel.width, vessel.draught,
-                vessel.dimension_to_bow, vessel.dimension_to_stern,
-                vessel.dimension_to_port, vessel.dimension_to_starboard,
-                sanitize_value(vessel.destination), sanitize_value(vessel.eta), sanitize_value(vessel.cargo),
-                vessel.deadweight, vessel.gross_tonnage,
-                sanitize_value(vessel.last_update), sanitize_value(vessel.first_seen), vessel.update_count
-            )
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO vessels (
-                    mmsi, lat, lon, speed, course, heading, rot,
-                    navigational_status, position_accuracy,
-                    name, imo, callsign, ship_type,
-                    length, width, draught,
-                    dimension_to_bow, dimension_to_stern,
-                    dimension_to_port, dimension_to_starboard,
-                    destination, eta, cargo, deadweight, gross_tonnage,
-                    last_update, first_seen, update_count,
-                    updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', params)
-            
+            self.conn.execute(SAVE_VESSEL_SQL, _vessel_params(vessel))
             self.conn.commit()
             
         except Exception as e:
@@ -236,9 +278,7 @@ class VesselDatabase:
             Vessel object if found, None otherwise
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM vessels WHERE mmsi = ?', (mmsi,))
-            row = cursor.fetchone()
+            row = self.conn.execute(GET_VESSEL_SQL, (mmsi,)).fetchone()
             
             if row:
                 return self._row_to_vessel(row)
@@ -248,6 +288,20 @@ class VesselDatabase:
             logger.error(f"Failed to get vessel {mmsi}: {e}")
             return None
     
+    def iter_all_vessels(self) -> Iterator[Vessel]:
+        """
+        Iterate over all vessels in the database, most recently updated first.
+        
+        Rows are fetched as the iterator is consumed, so the full result
+        set is never held in memory alongside the Vessel objects. Errors
+        are raised to the caller.
+        
+        Yields:
+            Vessel objects
+        """
+        for row in self.conn.execute(ALL_VESSELS_SQL):
+            yield self._row_to_vessel(row)
+    
     def get_all_vessels(self) -> List[Vessel]:
         """
         Get all vessels from database.
@@ -256,11 +310,7 @@ class VesselDatabase:
             List of Vessel objects
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM vessels ORDER BY last_update DESC')
-            rows = cursor.fetchall()
-            
-            return [self._row_to_vessel(row) for row in rows]
+            return list(self.iter_all_vessels())
             
         except Exception as e:
             logger.error(f"Failed to get all vessels: {e}")
@@ -277,13 +327,10 @@ class VesselDatabase:
             List of matching Vessel objects
         """
         try:
-            cursor = self.conn.cursor()
             placeholders = ','.join('?' * len(ship_types))
-            cursor.execute(
-                f'SELECT * FROM vessels WHERE ship_type IN ({placeholders}) ORDER BY last_update DESC',
-                ship_types
-            )
-            rows = cursor.fetchall()
+            rows = self.conn.execute(
+                VESSELS_BY_TYPE_SQL.format(placeholders=placeholders), list(ship_types)
+            ).fetchall()
             
             return [self._row_to_vessel(row) for row in rows]
             
@@ -291,62 +338,77 @@ class VesselDatabase:
             logger.error(f"Failed to get vessels by type: {e}")
             return []
     
-    def _row_to_vessel(self, row: sqlite3.Row) -> Vessel:
+    def _row_to_vessel(self, row: tuple) -> Vessel:
         """
         Convert database row to Vessel object.
         
         Args:
-            row: SQLite row object
+            row: Row tuple selected with VESSEL_COLUMNS
             
         Returns:
             Vessel object
         """
+        (mmsi, lat, lon, speed, course, heading, rot,
+         navigational_status, position_accuracy,
+         name, imo, callsign, ship_type,
+         length, width, draught,
+         dimension_to_bow, dimension_to_stern,
+         dimension_to_port, dimension_to_starboard,
+         destination, eta, cargo, deadweight, gross_tonnage,
+         last_update, first_seen, update_count) = row
         return Vessel(
-            mmsi=row['mmsi'],
-            lat=row['lat'],
-            lon=row['lon'],
-            speed=row['speed'],
-            course=row['course'],
-            heading=row['heading'],
-            rot=row['rot'],
-            navigational_status=row['navigational_status'],
-            position_accuracy=row['position_accuracy'],
-            name=row['name'],
-            imo=row['imo'],
-            callsign=row['callsign'],
-            ship_type=row['ship_type'],
-            length=row['length'],
-            width=row['width'],
-            draught=row['draught'],
-            dimension_to_bow=row['dimension_to_bow'],
-            dimension_to_stern=row['dimension_to_stern'],
-            dimension_to_port=row['dimension_to_port'],
-            dimension_to_starboard=row['dimension_to_starboard'],
-            destination=row['destination'],
-            eta=row['eta'],
-            cargo=row['cargo'],
-            deadweight=row['deadweight'],
-            gross_tonnage=row['gross_tonnage'],
-            last_update=row['last_update'],
-            first_seen=row['first_seen'],
-            update_count=row['update_count']
+            mmsi=mmsi,
+            lat=lat,
+            lon=lon,
+            speed=speed,
+            course=course,
+            heading=heading,
+            rot=rot,
+            navigational_status=navigational_status,
+            position_accuracy=position_accuracy,
+            name=name,
+            imo=imo,
+            callsign=callsign,
+            ship_type=ship_type,
+            length=length,
+            width=width,
+            draught=draught,
+            dimension_to_bow=dimension_to_bow,
+            dimension_to_stern=dimension_to_stern,
+            dimension_to_port=dimension_to_port,
+            dimension_to_starboard=dimension_to_starboard,
+            destination=destination,
+            eta=eta,
+            cargo=cargo,
+            deadweight=deadweight,
+            gross_tonnage=gross_tonnage,
+            last_update=last_update,
+            first_seen=first_seen,
+            update_count=update_count
         )
     
     def bulk_save(self, vessels: Dict[int, Vessel]):
         """
         Save multiple vessels efficiently.
         
+        All rows are written with one executemany() in a single transaction,
+        so the batch costs one commit instead of one per vessel.
+        
         Args:
             vessels: Dictionary of vessels keyed by MMSI
         """
         try:
-            for vessel in vessels.values():
-                self.save_vessel(vessel)
+            with self.conn:
+                self.conn.executemany(SAVE_VESSEL_SQL, [_vessel_params(v) for v in vessels.values()])
             
             logger.info(f"💾 Saved {len(vessels)} vessels to database")
             
         except Exception as e:
+            # The transaction was rolled back; save one by one so a single
+            # bad row does not lose the rest of the batch
             logger.error(f"Failed to bulk save vessels: {e}")
+            for vessel in vessels.values():
+                self.save_vessel(vessel)
     
     def get_statistics(self) -> Dict:
         """
@@ -359,13 +421,13 @@ class VesselDatabase:
             cursor = self.conn.cursor()
             
             cursor.execute('SELECT COUNT(*) as total FROM vessels')
-            total = cursor.fetchone()['total']
+            total = cursor.fetchone()[0]
             
             cursor.execute('SELECT COUNT(*) as tankers FROM vessels WHERE ship_type >= 70 AND ship_type < 90')
-            tankers = cursor.fetchone()['tankers']
+            tankers = cursor.fetchone()[0]
             
             cursor.execute('SELECT COUNT(*) as with_position FROM vessels WHERE lat IS NOT NULL AND lon IS NOT NULL')
-            with_position = cursor.fetchone()['with_position']
+            with_position = cursor.fetchone()[0]
             
             return {
                 'total_vessels': total,
@@ -421,15 +483,8 @@ class VesselDatabase:
             region: Current region
         """
         try:
-            cursor = self.conn.cursor()
             timestamp = datetime.utcnow().isoformat()
-            
-            cursor.execute('''
-                INSERT INTO vessel_history 
-                (mmsi, lat, lon, speed, course, heading, timestamp, region)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (mmsi, lat, lon, speed, course, heading, timestamp, region))
-            
+            self.conn.execute(SAVE_HISTORY_SQL, (mmsi, lat, lon, speed, course, heading, timestamp, region))
             self.conn.commit()
             
         except Exception as e:
@@ -459,15 +514,15 @@ class VesselDatabase:
             rows = cursor.fetchall()
             return [
                 {
-                    'lat': row['lat'],
-                    'lon': row['lon'],
-                    'speed': row['speed'],
-                    'course': row['course'],
-                    'heading': row['heading'],
-                    'timestamp': row['timestamp'],
-                    'region': row['region']
+                    'lat': lat,
+                    'lon': lon,
+                    'speed': speed,
+                    'course': course,
+                    'heading': heading,
+                    'timestamp': timestamp,
+                    'region': region
                 }
-                for row in rows
+                for lat, lon, speed, course, heading, timestamp, region in rows
             ]
             
         except Exception as e:
@@ -483,15 +538,8 @@ class VesselDatabase:
             region: Region name
         """
         try:
-            cursor = self.conn.cursor()
             timestamp = datetime.utcnow().isoformat()
-            
-            cursor.execute('''
-                UPDATE vessels
-                SET current_region = ?, last_region_update = ?
-                WHERE mmsi = ?
-            ''', (region, timestamp, mmsi))
-            
+            self.conn.execute(UPDATE_REGION_SQL, (region, timestamp, mmsi))
             self.conn.commit()
             
         except Exception as e:
@@ -508,14 +556,7 @@ class VesselDatabase:
             List of Vessel objects
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM vessels
-                WHERE current_region = ?
-                ORDER BY last_update DESC
-            ''', (region,))
-            
-            rows = cursor.fetchall()
+            rows = self.conn.execute(VESSELS_BY_REGION_SQL, (region,)).fetchall()
             return [self._row_to_vessel(row) for row in rows]
             
         except Exception as e:
@@ -533,7 +574,6 @@ class VesselDatabase:
             Number of records deleted
         """
         try:
-            from datetime import timedelta
             cursor = self.conn.cursor()
             cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
             
@@ -8,7 +8,7 @@ Provides enhanced vessel information by combining:
 """
 
 import logging
-from typing import Dict, Optional, List
+from typing import AbstractSet, Dict, Optional
 from datetime import datetime
 
 from models.vessel import Vessel
@@ -16,6 +16,9 @@ from utils.vessel_database import VesselDatabase
 
 logger = logging.getLogger(__name__)
 
+# Ship types whose missing deadweight enrich_vessel_data() estimates
+DWT_ESTIMATE_TYPES = frozenset({70, 71, 72, 73, 74, 80, 81, 82, 83, 84})
+
 
 class VesselInfoService:
     """
@@ -46,13 +49,16 @@ class VesselInfoService:
             # Check for missing ship_type data
             self.db.fix_missing_ship_types()
             
-            vessels = self.db.get_all_vessels()
-            for vessel in vessels:
+            # Stream rows straight into the cache, counting ship_type data as we go
+            loaded = 0
+            with_ship_type = 0
+            for vessel in self.db.iter_all_vessels():
                 self.vessels_cache[vessel.mmsi] = vessel
+                loaded += 1
+                if vessel.ship_type is not None:
+                    with_ship_type += 1
             
-            # Count how many vessels have ship_type data
-            with_ship_type = len([v for v in vessels if v.ship_type is not None])
-            logger.info(f"📚 Loaded {len(vessels)} vessels from database ({with_ship_type} with ship_type)")
+            logger.info(f"📚 Loaded {loaded} vessels from database ({with_ship_type} with ship_type)")
             
         except Exception as e:
             logger.error(f"Failed to load vessels from database: {e}")
@@ -161,12 +167,12 @@ class VesselInfoService:
             if vessel.has_position()
         }
     
-    def get_tankers(self, tanker_types: List[int]) -> Dict[int, Vessel]:
+    def get_tankers(self, tanker_types: AbstractSet[int]) -> Dict[int, Vessel]:
         """
         Get all tanker vessels.
         
         Args:
-            tanker_types: List of tanker ship type codes
+            tanker_types: Set of tanker ship type codes
             
         Returns:
             Dictionary of tanker vessels
@@ -223,7 +229,7 @@ class VesselInfoService:
             Enriched vessel
         """
         # Calculate estimated cargo capacity for tankers (rough approximation)
-        if vessel.is_tanker([70, 71, 72, 73, 74, 80, 81, 82, 83, 84]):
+        if vessel.is_tanker(DWT_ESTIMATE_TYPES):
             if vessel.length and vessel.width and vessel.draught:
                 # Very rough DWT estimate: length × width × draught × coefficient
                 # Typical tanker coefficient is around 0.7-0.8
@@ -8,6 +8,7 @@ and managing the tanker tracker.
 import asyncio
 import json
 import os
+import stat
 import sys
 import threading
 import time
@@ -68,9 +69,6 @@ class TrackerManager:
             self.tracker_thread = threading.Thread(target=run_tracker, daemon=True)
             self.tracker_thread.start()
             
-            # Give it a moment to initialize
-            time.sleep(2)
-            
             print(f"✅ Tracker started for {region}")
             return True
             
@@ -93,6 +91,11 @@ class TrackerManager:
             except Exception as e:
                 print(f"Warning: Error stopping tracker: {e}")
             
+            # Let the old tracker thread finish, so it does not write the
+            # shared map file after the next tracker has started
+            if self.tracker_thread and self.tracker_thread is not threading.current_thread():
+                self.tracker_thread.join(timeout=2.0)
+            
             self.tracker = None
             print("✅ Tracker stopped")
     
@@ -106,6 +109,26 @@ class TrackerManager:
         
         return self.start_tracker(new_region)
     
+    def is_map_ready(self) -> bool:
+        """
+        Return True once the map file holds a map of the current region.
+        
+        The running tracker's generator must have written the current region,
+        and the file must still be that write: a late write by a previous
+        tracker changes its modification time.
+        """
+        tracker = self.tracker
+        if not self.running or tracker is None or not hasattr(tracker, 'map_generator'):
+            return False
+        generator = tracker.map_generator
+        last_written = generator.last_written
+        if last_written is None or last_written[0] != self.current_region:
+            return False
+        try:
+            return os.stat(generator.output_file).st_mtime_ns == last_written[1]
+        except OSError:
+            return False
+    
     def get_current_region(self) -> str:
         """Get the current region. Returns default if not set."""
         return self.current_region or 'persian_gulf'
@@ -128,6 +151,11 @@ class TankersTrackerHandler(SimpleHTTPRequestHandler):
     # Class-level region switcher (shared across all requests)
     region_switcher = None
     
+    # ETag of the file being sent, added by end_headers()
+    _etag: Optional[str] = None
+    # Whether the file being sent has a gzip copy, so the response varies
+    _vary_encoding = False
+    
     @classmethod
     def set_region_switcher(cls, switcher):
         """Set the shared region switcher instance."""
@@ -136,6 +164,8 @@ class TankersTrackerHandler(SimpleHTTPRequestHandler):
     def do_GET(self):
         """Handle GET requests."""
         parsed_path = urlparse(self.path)
+        self._etag = None
+        self._vary_encoding = False
         
         if parsed_path.path == '/':
             # Redirect to the main map
@@ -152,6 +182,14 @@ class TankersTrackerHandler(SimpleHTTPRequestHandler):
             })
             return
         
+        elif parsed_path.path == '/api/region-status':
+            # Polled by the map after a region change until the new map exists
+            self.send_json_response({
+                'region': tracker_manager.current_region,
+                'ready': tracker_manager.is_map_ready()
+            })
+            return
+        
         elif parsed_path.path == '/api/regions':
             # Return all available regions
             regions_info = {}
@@ -164,9 +202,143 @@ class TankersTrackerHandler(SimpleHTTPRequestHandler):
             self.send_json_response(regions_info)
             return
         
+        # Answer revalidation of an unchanged file without sending it
+        path = self.translate_path(parsed_path.path)
+        self._etag = self._file_etag(path)
+        self._vary_encoding = self._etag is not None and os.path.exists(path + '.gz')
+        if self._etag and self._etag_matches(self._etag, self.headers.get('If-None-Match')):
+            self.send_response(304)
+            self.end_headers()
+            return
+        
+        # Serve the precompressed map files when the browser accepts gzip
+        if self._send_gzipped(path):
+            return
+        
         # Handle static files normally
         return super().do_GET()
     
+    @staticmethod
+    def _file_etag(path: str) -> Optional[str]:
+        """
+        Build a weak ETag from a file's modification time and size.
+        
+        MapGenerator replaces files atomically and leaves unchanged ones
+        alone, so this identifies the content without reading it. It is
+        weak because the same tag covers the gzip copy.
+        
+        Returns:
+            The ETag, or None if path is not a regular file
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    
+    @staticmethod
+    def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+        """
+        Check an If-None-Match header against a file's ETag.
+        
+        Uses weak comparison, as required for If-None-Match: the W/ prefix
+        is ignored on both sides. '*' matches any existing file.
+        
+        Returns:
+            True if the client's copy is current
+        """
+        if not if_none_match:
+            return False
+        opaque = etag[2:] if etag.startswith('W/') else etag
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return True
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == opaque:
+                return True
+        return False
+    
+    @staticmethod
+    def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+        """
+        Check whether an Accept-Encoding header allows a gzip response.
+        
+        An explicit gzip (or x-gzip) entry decides, otherwise '*' does; a
+        quality of 0 means the coding is not acceptable.
+        
+        Returns:
+            True if gzip has a non-zero quality
+        """
+        if not accept_encoding:
+            return False
+        gzip_q = star_q = None
+        for entry in accept_encoding.split(','):
+            coding, _, params = entry.partition(';')
+            coding = coding.strip().lower()
+            q = 1.0
+            for param in params.split(';'):
+                name, _, value = param.partition('=')
+                if name.strip().lower() == 'q':
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            if coding in ('gzip', 'x-gzip'):
+                gzip_q = q
+            elif coding == '*':
+                star_q = q
+        if gzip_q is None:
+            gzip_q = star_q
+        return bool(gzip_q)
+    
+    def end_headers(self):
+        """Add the ETag and Vary headers, if any, to file responses."""
+        if self._etag:
+            self.send_header('ETag', self._etag)
+        if self._vary_encoding:
+            self.send_header('Vary', 'Accept-Encoding')
+        super().end_headers()
+    
+    def _send_gzipped(self, path: str) -> bool:
+        """
+        Send the .gz copy of a file written by MapGenerator, if usable.
+        
+        Args:
+            path: Filesystem path of the requested file
+        
+        Returns:
+            True if the response was sent
+        """
+        if not self._accepts_gzip(self.headers.get('Accept-Encoding')):
+            return False
+        
+        try:
+            f = open(path + '.gz', 'rb')
+        except OSError:
+            return False
+        try:
+            gz_stat = os.fstat(f.fileno())
+            try:
+                # A copy older than the file is left over from a failed write
+                if gz_stat.st_mtime_ns < os.stat(path).st_mtime_ns:
+                    return False
+            except OSError:
+                return False
+            
+            self.send_response(200)
+            self.send_header('Content-Type', self.guess_type(path))
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(gz_stat.st_size))
+            self.end_headers()
+            self.copyfile(f, self.wfile)
+        finally:
+            f.close()
+        return True
+    
     def do_POST(self):
         """Handle POST requests."""
         parsed_path = urlparse(self.path)